@@ -0,0 +1,261 @@
+"""Start/stop latency benchmark for the service manager.
+
+    python bench.py [--runs N] [--log-size-mb MB] [--trace FILE] [--json FILE]
+
+Runs the real ServiceController against fake mongod/nginx processes
+(fake_service.py) on free local ports, so it works on any machine without
+MongoDB or nginx installed. The timings come from the lifecycle events the
+controller emits (see instrument.py), which are written to --trace as JSON
+lines when given. It also times opening a multi-GB synthetic log the way
+the log viewer does: the first page straight away, then the full index.
+"""
+import os
+import sys
+import json
+import time
+import socket
+import shutil
+import argparse
+import tempfile
+import statistics
+
+import psutil
+
+from core import ServiceController
+from registry import ServiceRegistry
+from logindex import LogIndex, LogSearch
+from instrument import tracer
+
+
+FAKE_SERVICE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fake_service.py')
+VIEWER_ROWS = 40
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def write_registry(workdir, args):
+    """Writes a services.json for a fake MongoDB and a fake Nginx that depends on it."""
+    python = [sys.executable, FAKE_SERVICE]
+    mongo_port, nginx_port = free_port(), free_port()
+    mongo_log = os.path.join(workdir, 'mongo.log')
+    nginx_log = os.path.join(workdir, 'error.log')
+    pid_file = os.path.join(workdir, 'nginx.pid')
+    delays = ['--startup-delay', str(args.startup_delay), '--stop-delay', str(args.stop_delay)]
+    services = {
+        "MongoDB": {
+            "start": python + ['mongod', '--port', str(mongo_port), '--logpath', mongo_log] + delays,
+            "stop": None,
+            "process": psutil.Process().name(),
+            "log_path": mongo_log,
+            "service_path": workdir,
+            "probes": [
+                {"type": "log", "pattern": "Waiting for connections"},
+                {"type": "mongo", "port": mongo_port}
+            ],
+            "ready_timeout": 30
+        },
+        "Nginx": {
+            "start": python + ['nginx', '--port', str(nginx_port), '--logpath', nginx_log,
+                               '--pid-file', pid_file, '--workers', str(args.workers)] + delays,
+            "stop": python + ['nginx', '--pid-file', pid_file, '-s', 'stop'],
+            "process": psutil.Process().name(),
+            "log_path": nginx_log,
+            "service_path": workdir,
+            "depends_on": ["MongoDB"],
+            "probes": [
+                {"type": "http", "url": f"http://127.0.0.1:{nginx_port}/"}
+            ],
+            "ready_timeout": 10
+        }
+    }
+    path = os.path.join(workdir, 'services.json')
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({"services": services}, f, indent=2)
+    return path
+
+
+def make_log(path, size_mb):
+    """Writes a synthetic mongod-style JSON log of about ``size_mb`` MB.
+
+    An existing file at least that big is reused, since writing a few GB
+    takes longer than the measurement itself.
+    """
+    size = size_mb * 1024 * 1024
+    if os.path.exists(path) and os.path.getsize(path) >= size:
+        return
+    levels = ['I'] * 90 + ['D1'] * 6 + ['W'] * 3 + ['E']
+    components = ['NETWORK', 'STORAGE', 'COMMAND', 'REPL', 'CONTROL', 'INDEX']
+    lines = []
+    for i in range(20000):
+        lines.append(json.dumps({
+            "t": {"$date": f"2024-01-01T00:{i // 600 % 60:02d}:{i // 10 % 60:02d}.{i % 1000:03d}+00:00"},
+            "s": levels[i % len(levels)],
+            "c": components[i % len(components)],
+            "id": 20000 + i % 997,
+            "ctx": f"conn{i % 113}",
+            "msg": "Slow query" if i % 7 == 0 else "Connection accepted",
+            "attr": {"remote": f"127.0.0.1:{40000 + i % 20000}", "durationMillis": i % 250,
+                     "padding": "x" * (i * 37 % 200)}
+        }, separators=(',', ':')))  # compact, like mongod writes it
+    block = ('\n'.join(lines) + '\n').encode('utf-8')
+    written = 0
+    with open(path, 'wb') as f:
+        while written < size:
+            f.write(block)
+            written += len(block)
+
+
+def pair_spans(events, begin, end):
+    """Per-service durations (ms) from each ``begin`` event to the next ``end`` event."""
+    durations = {}
+    pending = {}
+    for event in events:
+        service = event.get("service")
+        if event["event"] == begin:
+            pending[service] = event["mono"]
+        elif event["event"] == end and service in pending:
+            durations.setdefault(service, []).append((event["mono"] - pending.pop(service)) * 1000)
+    return durations
+
+
+def percentile(values, p):
+    """Nearest-rank percentile."""
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * p // 100))
+    return ordered[int(rank) - 1]
+
+
+def summarize(values):
+    return {
+        "n": len(values),
+        "p50": percentile(values, 50),
+        "p99": percentile(values, 99),
+        "mean": statistics.fmean(values),
+        "max": max(values),
+    }
+
+
+def timed(func, *args):
+    start = time.monotonic()
+    result = func(*args)
+    return result, (time.monotonic() - start) * 1000
+
+
+def bench_lifecycle(controller, runs, events):
+    """Start/stop cycles, then restarts. Returns {metric: [ms, ...]} and the failure count."""
+    samples = {}
+    failures = 0
+
+    def record(name, values):
+        samples.setdefault(name, []).extend(values)
+
+    for _ in range(runs):
+        del events[:]
+        results, elapsed = timed(controller.start)
+        failures += not all(results.values())
+        record("start all", [elapsed])
+        results, elapsed = timed(controller.stop)
+        failures += not all(results.values())
+        record("stop all", [elapsed])
+        for service, values in pair_spans(events, "start-requested", "ready").items():
+            record(f"start {service}", values)
+        for service, values in pair_spans(events, "spawn", "first-probe").items():
+            record(f"spawn->first probe {service}", values)
+        for service, values in pair_spans(events, "stop-requested", "stopped").items():
+            record(f"stop {service}", values)
+
+    controller.start()
+    for _ in range(runs):
+        del events[:]
+        results, elapsed = timed(controller.restart)
+        failures += not all(results.values())
+        record("restart all", [elapsed])
+        for service, values in pair_spans(events, "stop-requested", "ready").items():
+            record(f"restart {service}", values)
+    controller.stop()
+    return samples, failures
+
+
+def bench_log_open(path, runs):
+    """Times what LogViewer does on open and on the first full scan."""
+    samples = {}
+    for _ in range(runs):
+        start = time.monotonic()
+        index = LogIndex(path)
+        index.refresh()
+        index.tail_lines(VIEWER_ROWS)
+        samples.setdefault("log open (first page)", []).append((time.monotonic() - start) * 1000)
+
+        _, elapsed = timed(index.build)
+        samples.setdefault("log index (full)", []).append(elapsed)
+
+        start = time.monotonic()
+        search = LogSearch(index, level="error")
+        search.run()
+        samples.setdefault("log search (errors)", []).append((time.monotonic() - start) * 1000)
+        index.close()
+    return samples
+
+
+def print_report(samples):
+    width = max(len(name) for name in samples)
+    print(f"{'metric':<{width}}  {'n':>4}  {'p50 ms':>9}  {'p99 ms':>9}  {'max ms':>9}")
+    for name, values in samples.items():
+        s = summarize(values)
+        print(f"{name:<{width}}  {s['n']:>4}  {s['p50']:>9.1f}  {s['p99']:>9.1f}  {s['max']:>9.1f}")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Service manager latency benchmark.")
+    parser.add_argument('--runs', type=int, default=20, help="start/stop and restart cycles (default: %(default)s)")
+    parser.add_argument('--workers', type=int, default=2, help="fake nginx worker processes")
+    parser.add_argument('--startup-delay', type=float, default=0.0, help="seconds the fake services take to come up")
+    parser.add_argument('--stop-delay', type=float, default=0.0, help="seconds the fake services take to exit")
+    parser.add_argument('--log', help="synthetic log file to (re)use (default: inside the work dir)")
+    parser.add_argument('--log-size-mb', type=int, default=2048, help="synthetic log size, 0 to skip (default: %(default)s)")
+    parser.add_argument('--log-runs', type=int, default=3)
+    parser.add_argument('--workdir', help="keep fake service files here instead of a temp dir")
+    parser.add_argument('--trace', help="append lifecycle events to this JSON lines file")
+    parser.add_argument('--json', help="write the summary to this file")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    workdir = args.workdir or tempfile.mkdtemp(prefix='devtools-bench-')
+    os.makedirs(workdir, exist_ok=True)
+    if args.trace:
+        tracer.open(args.trace)
+    events = []
+    tracer.listeners.append(events.append)
+
+    controller = ServiceController(ServiceRegistry(write_registry(workdir, args)))
+    try:
+        samples, failures = bench_lifecycle(controller, args.runs, events)
+        if args.log_size_mb:
+            log_path = args.log or os.path.join(workdir, 'synthetic.log')
+            print(f"Preparing {args.log_size_mb} MB synthetic log at {log_path}...", file=sys.stderr)
+            make_log(log_path, args.log_size_mb)
+            samples.update(bench_log_open(log_path, args.log_runs))
+    finally:
+        controller.stop()
+        tracer.listeners.remove(events.append)
+        tracer.close()
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    print_report(samples)
+    if failures:
+        print(f"{failures} actions failed", file=sys.stderr)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({name: summarize(values) for name, values in samples.items()}, f, indent=2)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,179 @@
+"""Headless command line for the DevTools service manager.
+
+    python cli.py start [SERVICE ...]      start and wait until ready
+    python cli.py stop [SERVICE ...]
+    python cli.py restart [SERVICE ...]
+    python cli.py status [--json]
+    python cli.py logs SERVICE [-n N] [--follow]
+    python cli.py daemon [--api HOST:PORT]
+
+Commands go through a running daemon when one answers on --api, otherwise
+they run in this process. Nothing here imports tkinter.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+
+from core import ServiceController
+from daemon import ControlClient, DEFAULT_API_ADDRESS, serve
+from logfollow import LogFollower
+from logindex import LogIndex
+from registry import ServiceRegistry, RegistryError
+
+
+def print_message(message):
+    print(f"[{time.strftime('%H:%M:%S')}] {message}", file=sys.stderr, flush=True)
+
+
+def print_status(service_name, status, message):
+    if message:
+        print_message(f"{service_name}: {message}")
+
+
+def local_controller(args, names=()):
+    controller = ServiceController(ServiceRegistry(args.config), on_message=print_message)
+    check_names(names, controller.commands)
+    controller.ensure_service_dirs()
+    # One scan so services started by another CLI run are recognised
+    controller.detect_running_services()
+    controller.on_status = print_status
+    return controller
+
+
+def check_names(names, services):
+    unknown = [name for name in names if name not in services]
+    if unknown:
+        raise RegistryError(f"Unknown services: {', '.join(unknown)}")
+
+
+def cmd_control(args, client):
+    if client is not None:
+        results = client.control(args.command, args.services)
+    else:
+        controller = local_controller(args, args.services)
+        action = {'start': controller.start, 'stop': controller.stop, 'restart': controller.restart}[args.command]
+        results = action(args.services or None)
+    for name, ok in results.items():
+        print(f"{name}: {'ok' if ok else 'FAILED'}")
+    return 0 if all(results.values()) else 1
+
+
+def cmd_status(args, client):
+    services = client.status() if client is not None else local_controller(args).status()
+    if args.json:
+        print(json.dumps(services, indent=2))
+        return 0
+    width = max(len(name) for name in services)
+    for name, info in services.items():
+        pid = info["pid"] if info["pid"] is not None else "-"
+        print(f"{name:<{width}}  {info['status']:<9} {pid}")
+    return 0
+
+
+def cmd_logs(args, client):
+    if client is not None:
+        return follow_daemon_logs(args, client)
+    services = ServiceRegistry(args.config).services
+    check_names([args.service], services)
+    log_path = services[args.service]["log_path"]
+
+    # Follow from the current end before printing the tail, so nothing written
+    # in between is lost
+    follower = LogFollower(log_path, from_end=True)
+    index = LogIndex(log_path)
+    index.refresh()
+    for line in index.tail_lines(args.lines):
+        print(line)
+    index.close()
+    if index.error is not None and not args.follow:
+        print_message(f"Cannot read {log_path}: {index.error}")
+        return 1
+
+    try:
+        while args.follow:
+            for line in follower.read_new():
+                print(line, flush=True)
+            time.sleep(0.25)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def follow_daemon_logs(args, client):
+    lines, offset = client.logs(args.service, tail=args.lines)
+    for line in lines:
+        print(line)
+    try:
+        while args.follow:
+            time.sleep(0.25)
+            lines, offset = client.logs(args.service, offset)
+            for line in lines:
+                print(line, flush=True)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def cmd_daemon(args, client):
+    if client is not None:
+        print_message(f"A daemon is already listening on {args.api}")
+        return 1
+    controller = ServiceController(
+        ServiceRegistry(args.config),
+        on_status=print_status,
+        on_message=print_message
+    )
+    print_message(f"Listening on http://{args.api}")
+    try:
+        serve(controller, args.api)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="devtools", description="Headless DevTools service manager.")
+    parser.add_argument('--config', help="service registry file (default: services.json)")
+    parser.add_argument('--api', default=os.environ.get("DEVTOOLS_API", DEFAULT_API_ADDRESS),
+                        help="daemon address (default: %(default)s)")
+    parser.add_argument('--local', action='store_true', help="run in this process even if a daemon is running")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    for name in ('start', 'stop', 'restart'):
+        sub = commands.add_parser(name, help=f"{name} services (all when none are given)")
+        sub.add_argument('services', nargs='*')
+        sub.set_defaults(func=cmd_control)
+
+    sub = commands.add_parser('status', help="show service status")
+    sub.add_argument('--json', action='store_true')
+    sub.set_defaults(func=cmd_status)
+
+    sub = commands.add_parser('logs', help="print a service log")
+    sub.add_argument('service')
+    sub.add_argument('-n', '--lines', type=int, default=50)
+    sub.add_argument('-f', '--follow', action='store_true')
+    sub.set_defaults(func=cmd_logs)
+
+    sub = commands.add_parser('daemon', help="serve the control API")
+    sub.set_defaults(func=cmd_daemon)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    client = None
+    if not args.local:
+        candidate = ControlClient(args.api)
+        if candidate.available():
+            client = candidate
+    try:
+        return args.func(args, client)
+    except (RegistryError, RuntimeError, OSError) as e:
+        print_message(f"Error: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,265 @@
+import os
+import platform
+import subprocess
+import threading
+
+import psutil
+
+from logfollow import LogFollower
+from supervisor import ProcessSupervisor
+from probes import build_probe, wait_until_ready
+from orchestrator import Orchestrator
+from registry import ServiceRegistry
+from instrument import tracer
+
+
+class ServiceController:
+    """Start/stop/verify logic for the registered services, without any UI.
+
+    Shared by the Tk manager, the CLI and the daemon. Progress is reported
+    through two optional callbacks, which may be called from any thread:
+    ``on_status(service_name, status, message)`` and ``on_message(message)``.
+    """
+
+    def __init__(self, registry=None, on_status=None, on_message=None):
+        self.registry = registry or ServiceRegistry()
+        # Raises RegistryError for a broken services.json
+        self.commands = self.registry.validate()
+        self.on_status = on_status
+        self.on_message = on_message
+        self.running_services = set()
+        # service name -> Event set when the start in flight for it finishes
+        self.starting = {}
+        self.states = {name: ("stopped", "") for name in self.commands}
+        self.lock = threading.Lock()
+        self.supervisor = ProcessSupervisor(on_exit=self.process_exited)
+        self.orchestrator = Orchestrator(self.commands, self.start_service, self.stop_service)
+
+    # --- Reporting ---
+
+    def add_status_message(self, message):
+        if self.on_message is not None:
+            self.on_message(message)
+
+    def update_status(self, service_name, status, message=""):
+        with self.lock:
+            self.states[service_name] = (status, message)
+        if self.on_status is not None:
+            self.on_status(service_name, status, message)
+
+    def status(self):
+        """Snapshot of every service: state, last message and main PID."""
+        result = {}
+        with self.lock:
+            states = dict(self.states)
+        for name in self.commands:
+            record = self.supervisor.get(name)
+            state, message = states[name]
+            result[name] = {
+                "status": state,
+                "message": message,
+                "pid": record.pid if record is not None and record.is_alive() else None,
+            }
+        return result
+
+    def report_results(self, action, results):
+        failed = [name for name, ok in results.items() if not ok]
+        if failed:
+            self.add_status_message(f"Failed to {action}: {', '.join(failed)}")
+        elif results:
+            past = {"start": "started", "stop": "stopped", "restart": "restarted"}[action]
+            self.add_status_message(f"All services {past}.")
+
+    # --- Setup ---
+
+    def ensure_service_dirs(self):
+        """Creates the folders listed under "ensure_dirs" for each service."""
+        for service_name, config in self.commands.items():
+            for path in config.get("ensure_dirs", []):
+                if not os.path.exists(path):
+                    try:
+                        os.makedirs(path)
+                        self.add_status_message(f"Created '{path}' folder for {service_name}.")
+                    except OSError as e:
+                        self.add_status_message(f"Error creating '{path}' folder: {e}")
+
+    def detect_running_services(self):
+        """Picks up services left running by a previous session (one process scan)."""
+        try:
+            for service_name in self.supervisor.adopt_running(self.commands):
+                self.service_started(service_name)
+        except Exception as e:
+            self.add_status_message(f"Error detecting running services: {e}")
+
+    # --- Single services (blocking) ---
+
+    def verify_startup(self, service_name, follower):
+        """Waits until every readiness probe of the service passes."""
+        config = self.commands[service_name]
+        record = self.supervisor.get(service_name)
+
+        def on_attempt(attempt, pending):
+            if attempt == 1:
+                tracer.event("first-probe", service_name, pending=len(pending))
+
+        try:
+            probes = [build_probe(spec, follower) for spec in config.get("probes", [])]
+            ready, pending = wait_until_ready(
+                probes,
+                timeout=config.get("ready_timeout", 30),
+                alive=record.is_alive,
+                on_attempt=on_attempt
+            )
+        except Exception as e:
+            tracer.event("start-failed", service_name, reason=str(e))
+            self.add_status_message(f"Error verifying {service_name} startup: {e}")
+            self.update_status(service_name, "error", "Startup verification error")
+            return False
+
+        if ready:
+            tracer.event("ready", service_name)
+            self.service_started(service_name)
+            return True
+
+        tracer.event("start-failed", service_name,
+                     reason=", ".join(str(probe) for probe in pending) or "exited")
+        if not record.is_alive():
+            self.update_status(service_name, "error", f"Exited during startup (code {record.returncode})")
+        else:
+            waiting_for = ", ".join(str(probe) for probe in pending)
+            self.add_status_message(f"{service_name} failed to start within timeout (waiting for {waiting_for}).")
+            self.update_status(service_name, "error", "Service failed to start")
+        return ready
+
+    def run_service_command(self, service_name, command_type):
+        """Runs a start/stop command and blocks until it is verified. Returns True on success."""
+        command = self.commands[service_name][command_type]
+        try:
+            if command_type == 'start':
+                # Start following from the current end of the log so readiness lines
+                # left over from previous runs are not mistaken for this one.
+                follower = LogFollower(self.commands[service_name]["log_path"], from_end=True)
+                record = self.supervisor.spawn(service_name, command)
+                tracer.event("spawn", service_name, pid=record.pid)
+                return self.verify_startup(service_name, follower)
+
+            elif command_type == 'stop':
+                if self.supervisor.get(service_name) is None:
+                    # Started outside this session; look it up once
+                    self.supervisor.adopt_running({service_name: self.commands[service_name]})
+                self.supervisor.mark_stopping(service_name)
+                tracer.event("stop-requested", service_name)
+                if command:
+                    creationflags = subprocess.CREATE_NO_WINDOW if platform.system() == 'Windows' else 0
+                    subprocess.run(command, creationflags=creationflags)
+                return self.verify_stop(service_name)
+
+        except Exception as e:
+            self.add_status_message(f"Error executing {command_type} for {service_name}: {e}")
+            self.update_status(service_name, "error", "Command execution error")
+        return False
+
+    def start_service(self, service_name):
+        with self.lock:
+            if service_name in self.running_services:
+                # Already up and verified, e.g. a dependency shared with a service being restarted
+                return True
+            pending = self.starting.get(service_name)
+            owner = pending is None
+            if owner:
+                pending = self.starting[service_name] = threading.Event()
+
+        if not owner:
+            # Someone else is starting it; wait for their verdict instead of spawning a second copy
+            pending.wait()
+            with self.lock:
+                return service_name in self.running_services
+
+        try:
+            if self.supervisor.is_alive(service_name):
+                # Left over from a start that never became ready; spawning over its
+                # record would orphan it
+                self.supervisor.terminate(service_name)
+            tracer.event("start-requested", service_name)
+            self.update_status(service_name, "starting", "Starting...")
+            return self.run_service_command(service_name, "start")
+        finally:
+            with self.lock:
+                del self.starting[service_name]
+            pending.set()
+
+    def stop_service(self, service_name):
+        self.update_status(service_name, "stopping", "Stopping...")
+        return self.run_service_command(service_name, "stop")
+
+    def verify_stop(self, service_name, timeout=5):
+        # Without a stop command there is no graceful exit to wait for, so go
+        # straight to terminating the process
+        wait = timeout if self.commands[service_name].get("stop") else 0
+        try:
+            # Graceful stop first (nginx -s stop), then terminate what is left of the tree
+            if self.supervisor.wait_exit(service_name, timeout=wait) or \
+                    self.supervisor.terminate(service_name, timeout=timeout):
+                tracer.event("stopped", service_name)
+                self.service_stopped(service_name)
+                return True
+        except psutil.AccessDenied:
+            self.add_status_message(f"Access denied while stopping {service_name}")
+            self.update_status(service_name, "error", "Access Denied")
+            return False
+        except Exception as e:
+            self.add_status_message(f"Error verifying stop for {service_name}: {e}")
+            self.update_status(service_name, "error", "Stop verification error")
+            return False
+
+        self.update_status(service_name, "error", f"{service_name} failed to stop completely")
+        return False
+
+    def service_started(self, service_name):
+        with self.lock:
+            self.running_services.add(service_name)
+        self.update_status(service_name, "running", "Running")
+
+    def service_stopped(self, service_name):
+        with self.lock:
+            self.running_services.discard(service_name)
+        self.update_status(service_name, "stopped", "Stopped")
+
+    def process_exited(self, record):
+        """Called from the supervisor's watcher thread when a service process ends."""
+        tracer.event("exited", record.service_name, returncode=record.returncode, expected=record.stopping)
+        if record.stopping:
+            return
+        with self.lock:
+            was_running = record.service_name in self.running_services
+            self.running_services.discard(record.service_name)
+        if was_running:
+            self.update_status(record.service_name, "error", f"Exited unexpectedly (code {record.returncode})")
+
+    # --- Groups of services (blocking, dependency aware) ---
+
+    def active_services(self):
+        """Services that are running or still have a supervised process."""
+        with self.lock:
+            running = set(self.running_services)
+        return [name for name in self.commands if name in running or self.supervisor.get(name)]
+
+    def skipped_service(self, service_name, dependency):
+        self.update_status(service_name, "error", f"Not started because {dependency} is not ready")
+
+    def start(self, names=None):
+        results = self.orchestrator.start(names or list(self.commands), self.skipped_service)
+        self.report_results("start", results)
+        return results
+
+    def stop(self, names=None):
+        results = self.orchestrator.stop(names or self.active_services())
+        self.report_results("stop", results)
+        return results
+
+    def restart(self, names=None):
+        # Start is chained on the stops actually completing, not on a fixed delay
+        results = self.orchestrator.restart(names or list(self.commands), self.skipped_service,
+                                            active=self.active_services())
+        self.report_results("restart", results)
+        return results
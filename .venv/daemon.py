@@ -0,0 +1,212 @@
+import os
+import json
+import threading
+import http.client
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs, quote
+
+from logfollow import LogFollower
+from logindex import LogIndex
+
+
+DEFAULT_API_ADDRESS = "127.0.0.1:8765"
+
+
+def parse_address(address):
+    host, _, port = (address or DEFAULT_API_ADDRESS).rpartition(':')
+    return host or '127.0.0.1', int(port)
+
+
+class ControlServer(ThreadingHTTPServer):
+    """Local JSON API over one ServiceController, so any number of clients
+    share a single supervisor instead of each scanning the process table.
+
+    GET  /status                         -> {"services": {name: {...}}}
+    GET  /logs?service=NAME&offset=N     -> {"lines": [...], "offset": N}
+    GET  /logs?service=NAME&tail=N       -> last N lines and the offset to follow from
+    POST /start, /stop, /restart         -> {"results": {name: bool}}
+         (body: {"services": [names]}; omit for all services)
+    POST /shutdown                       -> stops the daemon, not the services
+
+    The API has no credentials, so it only answers requests that a web page
+    in the user's browser cannot forge: the Host header must name the address
+    the daemon listens on (against DNS rebinding), a browser Origin is
+    refused, and POST bodies must be sent as application/json, which a page
+    cannot do cross-origin without a CORS preflight this server never grants.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, controller, address=DEFAULT_API_ADDRESS):
+        super().__init__(parse_address(address), ControlHandler)
+        self.controller = controller
+        # Control actions are serialized so two clients cannot start the same
+        # service twice; status and logs are served concurrently.
+        self.action_lock = threading.Lock()
+
+    def allowed_host(self, value):
+        """True if a Host header names this server's own address."""
+        value = value or ''
+        if ':' in value and not value.endswith(']'):
+            host, _, port = value.rpartition(':')
+        else:
+            host, port = value, '80'
+        if port != str(self.server_address[1]):
+            return False
+        return host.strip('[]') in ('127.0.0.1', 'localhost', '::1', self.server_address[0])
+
+
+class ControlHandler(BaseHTTPRequestHandler):
+    server_version = "DevToolsDaemon/1.0"
+
+    def check_request(self):
+        """Sends 403 and returns False for requests that may come from a web page."""
+        if not self.server.allowed_host(self.headers.get('Host')):
+            self.send_json(403, {"error": "Unexpected Host header"})
+            return False
+        if self.headers.get('Origin') is not None:
+            self.send_json(403, {"error": "Browser requests are not accepted"})
+            return False
+        return True
+
+    def do_GET(self):
+        if not self.check_request():
+            return
+        url = urlsplit(self.path)
+        query = parse_qs(url.query)
+        controller = self.server.controller
+        if url.path == '/status':
+            self.send_json(200, {"services": controller.status()})
+        elif url.path == '/logs':
+            name = query.get('service', [''])[0]
+            if name not in controller.commands:
+                self.send_json(404, {"error": f"Unknown service {name!r}"})
+                return
+            try:
+                offset = int(query.get('offset', ['0'])[0])
+                tail = int(query['tail'][0]) if 'tail' in query else None
+            except ValueError:
+                self.send_json(400, {"error": "offset and tail must be integers"})
+                return
+            if offset < 0 or (tail is not None and tail < 0):
+                self.send_json(400, {"error": "offset and tail must not be negative"})
+                return
+
+            log_path = controller.commands[name]["log_path"]
+            if tail is not None:
+                index = LogIndex(log_path)
+                index.refresh()
+                lines = index.tail_lines(tail)
+                index.close()
+                self.send_json(200, {"lines": lines, "offset": index.size})
+                return
+            follower = LogFollower(log_path)
+            follower.offset = offset
+            lines = follower.read_new(max_bytes=1024 * 1024)
+            self.send_json(200, {"lines": lines, "offset": follower.position})
+        else:
+            self.send_json(404, {"error": "Not found"})
+
+    def do_POST(self):
+        if not self.check_request():
+            return
+        content_type = (self.headers.get('Content-Type') or '').split(';')[0].strip().lower()
+        if content_type != 'application/json':
+            self.send_json(415, {"error": "Content-Type must be application/json"})
+            return
+        controller = self.server.controller
+        path = urlsplit(self.path).path
+        actions = {'/start': controller.start, '/stop': controller.stop, '/restart': controller.restart}
+        if path == '/shutdown':
+            self.send_json(200, {"ok": True})
+            threading.Thread(target=self.server.shutdown, daemon=True).start()
+            return
+        if path not in actions:
+            self.send_json(404, {"error": "Not found"})
+            return
+
+        try:
+            length = int(self.headers.get('Content-Length') or 0)
+            body = json.loads(self.rfile.read(length) or b'{}')
+        except ValueError:
+            self.send_json(400, {"error": "Invalid JSON body"})
+            return
+        if not isinstance(body, dict):
+            self.send_json(400, {"error": "Body must be a JSON object"})
+            return
+        names = body.get("services")
+        if names is not None and (not isinstance(names, list) or not all(isinstance(n, str) for n in names)):
+            self.send_json(400, {"error": "\"services\" must be a list of service names"})
+            return
+        names = names or None
+        unknown = [name for name in names or [] if name not in controller.commands]
+        if unknown:
+            self.send_json(404, {"error": f"Unknown services: {', '.join(unknown)}"})
+            return
+
+        with self.server.action_lock:
+            results = actions[path](names)
+        self.send_json(200, {"results": results})
+
+    def send_json(self, status, data):
+        body = json.dumps(data).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class ControlClient:
+    """Talks to a running ControlServer."""
+
+    def __init__(self, address=None):
+        self.host, self.port = parse_address(address or os.environ.get("DEVTOOLS_API"))
+
+    def request(self, method, path, data=None, timeout=None):
+        conn = http.client.HTTPConnection(self.host, self.port, timeout=timeout)
+        try:
+            if method == 'POST' and data is None:
+                data = {}
+            body = json.dumps(data).encode('utf-8') if data is not None else None
+            headers = {'Content-Type': 'application/json'} if body is not None else {}
+            conn.request(method, path, body=body, headers=headers)
+            response = conn.getresponse()
+            payload = json.loads(response.read() or b'{}')
+            if response.status != 200:
+                raise RuntimeError(payload.get("error", f"HTTP {response.status}"))
+            return payload
+        finally:
+            conn.close()
+
+    def available(self):
+        try:
+            self.request('GET', '/status', timeout=0.5)
+            return True
+        except (OSError, ValueError, RuntimeError):
+            return False
+
+    def status(self):
+        return self.request('GET', '/status')["services"]
+
+    def control(self, action, names=None):
+        return self.request('POST', f'/{action}', {"services": names or []})["results"]
+
+    def logs(self, service_name, offset=0, tail=None):
+        """Returns (lines, next offset); with ``tail``, the last lines instead."""
+        query = f'tail={tail}' if tail is not None else f'offset={offset}'
+        data = self.request('GET', f'/logs?service={quote(service_name)}&{query}')
+        return data["lines"], data["offset"]
+
+
+def serve(controller, address=DEFAULT_API_ADDRESS):
+    controller.ensure_service_dirs()
+    controller.detect_running_services()
+    server = ControlServer(controller, address)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
@@ -0,0 +1,58 @@
+import time
+import queue
+
+
+class UIEventQueue:
+    """Thread-safe hand-off of UI updates from worker threads to the Tk main loop.
+
+    Workers only ever call post(); the main loop calls drain() from a
+    root.after tick and applies the whole batch at once.
+    """
+
+    def __init__(self):
+        self._queue = queue.SimpleQueue()
+
+    def post(self, kind, *args):
+        self._queue.put((kind, args))
+
+    def call(self, func, *args):
+        """Runs ``func(*args)`` on the main loop at the next drain."""
+        self.post('call', func, *args)
+
+    def drain(self, max_events=1000):
+        events = []
+        try:
+            while len(events) < max_events:
+                events.append(self._queue.get_nowait())
+        except queue.Empty:
+            pass
+        return events
+
+
+def coalesce(events, closed=None):
+    """Folds a drained batch into what one UI frame has to apply.
+
+    'call' events run here, in order; one that raises becomes an "UI update
+    failed" message. Messages are flattened to a single line each, so the
+    status panel can count Text lines as messages. For 'status' events only
+    the latest colour per service is kept. Stops right after a call once
+    ``closed()`` is true (the window went away).
+
+    Returns (messages, {service: colour}, stopped).
+    """
+    messages = []
+    statuses = {}
+    for kind, args in events:
+        if kind == 'message':
+            messages.append(' '.join(str(args[0]).splitlines()))
+        elif kind == 'status':
+            statuses[args[0]] = args[1]
+        elif kind == 'call':
+            try:
+                args[0](*args[1:])
+            except Exception as e:
+                error = ' '.join(str(e).splitlines())
+                messages.append(f"[{time.strftime('%H:%M:%S')}] UI update failed: {error}")
+            if closed is not None and closed():
+                return messages, statuses, True
+    return messages, statuses, False
@@ -0,0 +1,157 @@
+"""Stand-ins for mongod and nginx, used by bench.py.
+
+    python fake_service.py mongod --port P --logpath FILE [--startup-delay S]
+    python fake_service.py nginx --port P --logpath FILE --pid-file FILE [--workers N]
+    python fake_service.py nginx --pid-file FILE -s stop
+
+The fake mongod appends the same JSON "Waiting for connections" line as the
+real one and answers ``ping`` over OP_MSG; the fake nginx serves HTTP, runs
+worker child processes and honours ``-s stop`` through its pid file. Both
+exit on SIGTERM after ``--stop-delay`` seconds.
+"""
+import os
+import sys
+import json
+import time
+import signal
+import struct
+import argparse
+import datetime
+import threading
+import subprocess
+import socketserver
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from probes import _bson_encode, _recv_exact
+
+
+class MongoHandler(socketserver.BaseRequestHandler):
+    """Replies {ok: 1} to every OP_MSG on the connection."""
+
+    def handle(self):
+        try:
+            while True:
+                header = _recv_exact(self.request, 16)
+                length, request_id, _, op_code = struct.unpack('<iiii', header)
+                _recv_exact(self.request, length - 16)
+                body = struct.pack('<IB', 0, 0) + _bson_encode({'ok': 1})
+                self.request.sendall(struct.pack('<iiii', 16 + len(body), 0, request_id, op_code) + body)
+        except (OSError, struct.error):
+            pass
+
+
+class NginxHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = b"<h1>Welcome to fake nginx!</h1>"
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class ReusableTCPServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+def append_log(path, line):
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(line + '\n')
+
+
+def mongo_log_line(message, **attr):
+    now = datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='milliseconds')
+    return json.dumps({"t": {"$date": now}, "s": "I", "c": "NETWORK", "id": 23016, "ctx": "listener",
+                       "msg": message, "attr": attr})
+
+
+def nginx_log_line(level, message):
+    return f"{time.strftime('%Y/%m/%d %H:%M:%S')} [{level}] {os.getpid()}#0: {message}"
+
+
+def run_mongod(args, stop):
+    time.sleep(args.startup_delay)
+    server = ReusableTCPServer(('127.0.0.1', args.port), MongoHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    append_log(args.logpath, mongo_log_line("Waiting for connections", port=args.port, ssl="off"))
+    stop.wait()
+    time.sleep(args.stop_delay)
+    server.server_close()
+
+
+def run_nginx(args, stop):
+    time.sleep(args.startup_delay)
+    server = ThreadingHTTPServer(('127.0.0.1', args.port), NginxHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    with open(args.pid_file, 'w') as f:
+        f.write(str(os.getpid()))
+
+    workers = [
+        subprocess.Popen([sys.executable, os.path.abspath(__file__), 'worker'], stdin=subprocess.PIPE)
+        for _ in range(args.workers)
+    ]
+    append_log(args.logpath, nginx_log_line("notice", f"start worker processes ({args.workers})"))
+    stop.wait()
+    time.sleep(args.stop_delay)
+    for worker in workers:
+        worker.stdin.close()
+    for worker in workers:
+        worker.wait()
+    append_log(args.logpath, nginx_log_line("notice", "exiting"))
+    server.server_close()
+    try:
+        os.remove(args.pid_file)
+    except OSError:
+        pass
+
+
+def run_worker():
+    # Lives until the master closes our stdin (or dies)
+    sys.stdin.read()
+
+
+def send_stop(args):
+    try:
+        with open(args.pid_file) as f:
+            pid = int(f.read().strip())
+        os.kill(pid, signal.SIGTERM)
+    except (OSError, ValueError) as e:
+        print(f"fake nginx: cannot signal master: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('kind', choices=('mongod', 'nginx', 'worker'))
+    parser.add_argument('--port', type=int)
+    parser.add_argument('--logpath')
+    parser.add_argument('--pid-file')
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--startup-delay', type=float, default=0.0)
+    parser.add_argument('--stop-delay', type=float, default=0.0)
+    parser.add_argument('-s', dest='signal', choices=('stop',))
+    args = parser.parse_args(argv)
+
+    if args.kind == 'worker':
+        run_worker()
+        return 0
+    if args.signal == 'stop':
+        return send_stop(args)
+
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop.set())
+    if args.kind == 'mongod':
+        run_mongod(args, stop)
+    else:
+        run_nginx(args, stop)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,102 @@
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+
+
+class Tracer:
+    """Writes timestamped lifecycle events as JSON lines.
+
+    Every event carries a wall-clock ``ts`` and a monotonic ``mono`` (seconds)
+    so spans can be rebuilt afterwards. With no output file and no listeners
+    the tracer is disabled and emitting costs one attribute check.
+    """
+
+    def __init__(self, path=None):
+        self.path = None
+        self.listeners = []
+        self._lock = threading.Lock()
+        self._file = None
+        if path:
+            self.open(path)
+
+    @classmethod
+    def from_env(cls):
+        return cls(os.environ.get("DEVTOOLS_TRACE") or None)
+
+    def open(self, path):
+        """Starts appending events to ``path`` (replacing any previous file)."""
+        f = open(path, 'a', buffering=1, encoding='utf-8')
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+            self._file = f
+            self.path = path
+
+    @property
+    def enabled(self):
+        return self._file is not None or bool(self.listeners)
+
+    def event(self, name, service=None, **fields):
+        if not self.enabled:
+            return
+        record = {"ts": time.time(), "mono": time.monotonic(), "event": name}
+        if service is not None:
+            record["service"] = service
+        record.update(fields)
+        with self._lock:
+            if self._file is not None:
+                self._file.write(json.dumps(record) + '\n')
+            for listener in self.listeners:
+                listener(record)
+
+    @contextmanager
+    def span(self, name, service=None, **fields):
+        """Emits ``name`` with ``duration_ms`` once the block finishes."""
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.event(name, service, duration_ms=(time.monotonic() - start) * 1000, **fields)
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+                self.path = None
+
+
+tracer = Tracer.from_env()
+
+
+class StallMonitor:
+    """Reports UI-thread stalls from a periodic Tk ``after`` tick.
+
+    Each tick records how late it ran; anything later than ``threshold_ms``
+    means the main loop was blocked for about that long.
+    """
+
+    def __init__(self, root, interval_ms=100, threshold_ms=100, trace=None):
+        self.root = root
+        self.interval_ms = interval_ms
+        self.threshold_ms = threshold_ms
+        self.tracer = trace or tracer
+        self.worst_ms = 0.0
+        self._expected = None
+
+    def start(self):
+        if self.tracer.enabled:
+            self._schedule()
+
+    def _schedule(self):
+        self._expected = time.monotonic() + self.interval_ms / 1000
+        self.root.after(self.interval_ms, self._tick)
+
+    def _tick(self):
+        late_ms = (time.monotonic() - self._expected) * 1000
+        if late_ms > self.threshold_ms:
+            self.worst_ms = max(self.worst_ms, late_ms)
+            self.tracer.event("ui-stall", duration_ms=late_ms)
+        self._schedule()
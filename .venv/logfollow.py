@@ -0,0 +1,121 @@
+import os
+import json
+
+
+class LogFollower:
+    """Follows a growing log file, reading only bytes appended since the last read.
+
+    Keeps the byte offset and the identity of the file it is reading, so a
+    rotated (replaced) or truncated log is picked up from the start again
+    instead of being re-read as a whole or silently skipped.
+    """
+
+    def __init__(self, path, from_end=False, encoding='utf-8', chunk_size=64 * 1024):
+        self.path = path
+        self.encoding = encoding
+        self.chunk_size = chunk_size
+        self.offset = 0
+        self._identity = None
+        self._partial = b''
+        if from_end:
+            self.seek_end()
+
+    def _stat(self):
+        try:
+            return os.stat(self.path)
+        except OSError:
+            return None
+
+    def seek_end(self):
+        """Skips everything currently in the file; only later appends are read."""
+        st = self._stat()
+        self._partial = b''
+        if st is None:
+            self.offset = 0
+            self._identity = None
+        else:
+            self.offset = st.st_size
+            self._identity = (st.st_dev, st.st_ino)
+
+    def reset(self):
+        self.offset = 0
+        self._identity = None
+        self._partial = b''
+
+    @property
+    def position(self):
+        """Offset just past the last complete line handed out by read_new()."""
+        return self.offset - len(self._partial)
+
+    def read_new(self, max_bytes=None):
+        """Returns the complete lines appended since the last call.
+
+        A trailing line without a newline is held back until it is finished.
+        Returns an empty list if the file does not exist (yet).
+        """
+        st = self._stat()
+        if st is None:
+            return []
+
+        identity = (st.st_dev, st.st_ino)
+        if self._identity is not None and identity != self._identity:
+            # Rotated: the path now points at a different file
+            self.reset()
+        elif st.st_size < self.offset:
+            # Truncated (e.g. logs cleared on stop)
+            self.reset()
+        self._identity = identity
+
+        if st.st_size == self.offset:
+            return []
+
+        to_read = st.st_size - self.offset
+        if max_bytes is not None:
+            to_read = min(to_read, max_bytes)
+
+        data = []
+        try:
+            with open(self.path, 'rb') as f:
+                f.seek(self.offset)
+                while to_read > 0:
+                    chunk = f.read(min(self.chunk_size, to_read))
+                    if not chunk:
+                        break
+                    data.append(chunk)
+                    to_read -= len(chunk)
+        except OSError:
+            return []
+
+        data = b''.join(data)
+        self.offset += len(data)
+        data = self._partial + data
+
+        lines = data.split(b'\n')
+        self._partial = lines.pop()
+        return [line.rstrip(b'\r').decode(self.encoding, errors='replace') for line in lines]
+
+
+def log_message(line):
+    """Returns the human readable message of a log line.
+
+    MongoDB 4.4+ writes structured JSON logs where the text lives in the
+    "msg" field; any other line is returned unchanged.
+    """
+    if line.startswith('{'):
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            return line
+        if isinstance(entry, dict) and isinstance(entry.get('msg'), str):
+            return entry['msg']
+    return line
+
+
+def line_matches(line, patterns):
+    if isinstance(patterns, str):
+        patterns = (patterns,)
+    # Cheap substring check first so JSON is only parsed for candidate lines
+    if not any(p in line for p in patterns):
+        return False
+    message = log_message(line)
+    return any(p in message for p in patterns)
@@ -0,0 +1,306 @@
+import os
+import re
+import mmap
+import threading
+from array import array
+from bisect import bisect_right
+from itertools import accumulate, chain, islice, repeat
+from operator import add
+from contextlib import contextmanager
+
+
+# Severity spellings used by MongoDB's JSON log ("s" field) and nginx's error.log
+LOG_LEVELS = {
+    'error': (rb'"s":"(?:F|E)"', rb'\[(?:error|crit|alert|emerg)\]'),
+    'warning': (rb'"s":"W"', rb'\[warn\]'),
+    'info': (rb'"s":"I"', rb'\[(?:info|notice)\]'),
+    'debug': (rb'"s":"D\d?"', rb'\[debug\]'),
+}
+
+
+class LogIndex:
+    """Line-offset index over a memory-mapped log file.
+
+    The index is built in chunks (normally on a background thread via
+    build_async) and only ever extended, so appended data costs only the new
+    bytes. Readers fetch individual line ranges, which keeps the cost of
+    showing a page independent of the file size.
+
+    The file is opened and mapped only for the duration of each read; no
+    handle is kept between calls. On Windows an open handle or mapping blocks
+    mongod's logRotate rename and truncation, so a viewer left open must not
+    hold one. A read that finds the file rotated or truncated since the last
+    refresh() returns nothing until the next refresh() re-indexes it. The
+    remaining window is one read: rotating during that read still fails on
+    Windows, and truncating during it can fault on POSIX.
+    """
+
+    def __init__(self, path, chunk_size=4 * 1024 * 1024):
+        self.path = path
+        self.chunk_size = chunk_size
+        self.generation = 0
+        self.error = None
+        self._lock = threading.RLock()
+        self._identity = None
+        self._size = 0
+        self._scanned = 0
+        self._offsets = array('q', [0])
+        self._builder = None
+        self._closed = False
+
+    # --- Mapping ---
+
+    def refresh(self):
+        """Picks up growth, truncation or rotation of the file.
+
+        Returns True if anything changed since the last call.
+        """
+        try:
+            st = os.stat(self.path)
+        except OSError as e:
+            with self._lock:
+                changed = self.error is None
+                self._reset()
+                self.error = e
+            return changed
+
+        with self._lock:
+            changed = self.error is not None
+            self.error = None
+            identity = (st.st_dev, st.st_ino)
+            if identity != self._identity or st.st_size < self._size:
+                self._reset()
+                self._identity = identity
+                changed = True
+            if st.st_size != self._size:
+                self._size = st.st_size
+                changed = True
+            return changed
+
+    def _reset(self):
+        self.generation += 1
+        self._identity = None
+        self._size = 0
+        self._scanned = 0
+        self._offsets = array('q', [0])
+
+    @contextmanager
+    def _mapping(self):
+        """Maps the indexed part of the file for one read; yields None if unavailable.
+
+        Callers hold self._lock.
+        """
+        # Zero-length files cannot be mapped
+        if not self._size:
+            yield None
+            return
+        try:
+            f = open(self.path, 'rb')
+        except OSError:
+            yield None
+            return
+        with f:
+            st = os.fstat(f.fileno())
+            if (st.st_dev, st.st_ino) != self._identity or st.st_size < self._size:
+                # Rotated or truncated since refresh(); the next refresh re-indexes
+                yield None
+                return
+            with mmap.mmap(f.fileno(), self._size, access=mmap.ACCESS_READ) as mm:
+                yield mm
+
+    def close(self):
+        # Nothing is held open between reads; this only stops a running build
+        self._closed = True
+
+    # --- Indexing ---
+
+    @property
+    def size(self):
+        return self._size
+
+    @property
+    def complete(self):
+        return self._scanned >= self._size
+
+    @property
+    def progress(self):
+        return self._scanned / self._size if self._size else 1.0
+
+    def build(self, max_bytes=None):
+        """Extends the index over data mapped but not yet indexed."""
+        done = 0
+        while not self._closed:
+            with self._lock, self._mapping() as mm:
+                start = self._scanned
+                end = min(self._size, start + self.chunk_size)
+                if mm is None or start >= end:
+                    return
+                generation = self.generation
+                data = mm[start:end]
+
+            # Line start offsets = running sum of (line length + 1); kept in C
+            # iterators because this loop is what bounds indexing speed.
+            parts = data.split(b'\n')
+            parts.pop()
+            offsets = array('q', islice(accumulate(chain((start,), map(add, map(len, parts), repeat(1)))), 1, None))
+
+            with self._lock:
+                if generation != self.generation:
+                    continue
+                self._offsets.extend(offsets)
+                self._scanned = end
+
+            done += end - start
+            if max_bytes is not None and done >= max_bytes:
+                return
+
+    def build_async(self):
+        """Runs build() on a background thread unless one is already running."""
+        if self._builder is not None and self._builder.is_alive():
+            return
+        self._builder = threading.Thread(target=self.build, daemon=True)
+        self._builder.start()
+
+    @property
+    def building(self):
+        return self._builder is not None and self._builder.is_alive()
+
+    # --- Reading ---
+
+    def line_count(self):
+        """Number of lines indexed so far, counting an unterminated last line."""
+        with self._lock:
+            count = len(self._offsets) - 1
+            if self.complete and self._size > self._offsets[-1]:
+                count += 1
+            return count
+
+    def _line_span(self, i):
+        start = self._offsets[i]
+        end = self._offsets[i + 1] - 1 if i + 1 < len(self._offsets) else self._size
+        return start, end
+
+    def get_lines(self, start, count):
+        with self._lock:
+            total = self.line_count()
+            return self.get_line_list(range(max(0, start), min(total, start + count)))
+
+    def get_line_list(self, numbers):
+        with self._lock, self._mapping() as mm:
+            if mm is None:
+                return []
+            lines = []
+            for i in numbers:
+                a, b = self._line_span(i)
+                lines.append(_decode(mm[a:b]))
+            return lines
+
+    def tail_lines(self, count):
+        """Returns the last ``count`` lines without needing the index."""
+        with self._lock, self._mapping() as mm:
+            if mm is None:
+                return []
+            end = self._size
+            if end and mm[end - 1:end] == b'\n':
+                end -= 1
+            cursor = end
+            for _ in range(count):
+                cursor = mm.rfind(b'\n', 0, cursor)
+                if cursor == -1:
+                    break
+            start = cursor + 1
+            return [_decode(line) for line in mm[start:end].split(b'\n')] if end > start else []
+
+    def line_at(self, offset):
+        with self._lock:
+            return bisect_right(self._offsets, offset) - 1
+
+    def read_range(self, start_line, end_line):
+        """Returns (base offset, raw bytes) covering lines [start_line, end_line)."""
+        with self._lock, self._mapping() as mm:
+            if mm is None or start_line >= end_line:
+                return 0, b''
+            a = self._offsets[start_line]
+            b = self._line_span(end_line - 1)[1]
+            return a, mm[a:b]
+
+
+class LogSearch:
+    """Background search/filter over a LogIndex.
+
+    Matching line numbers are collected in ``matches`` as the scan runs, so
+    the viewer can show partial results. resume() continues the scan over
+    lines indexed after the previous run, which keeps tail mode filtered.
+    """
+
+    def __init__(self, index, query='', level=None, component='', batch_lines=50000):
+        self.index = index
+        self.query = query
+        self.level = level
+        self.component = component
+        self.batch_lines = batch_lines
+        self.generation = index.generation
+        self.matches = array('q')
+        self.scanned = 0
+        self.cancelled = False
+        self._thread = None
+
+        patterns = []
+        if query:
+            patterns.append(re.compile(re.escape(query.encode('utf-8')), re.IGNORECASE))
+        if level:
+            patterns.append(re.compile(b'|'.join(LOG_LEVELS[level])))
+        if component:
+            name = re.escape(component.strip().upper().encode('utf-8'))
+            patterns.append(re.compile(rb'"c":"' + name + rb'\s*"|\b' + name + rb'\b', re.IGNORECASE))
+        # The first pattern drives the scan; the others are checked per hit line
+        self._primary = patterns[0] if patterns else None
+        self._others = patterns[1:]
+
+    @property
+    def active(self):
+        return self._primary is not None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def cancel(self):
+        self.cancelled = True
+
+    def resume(self):
+        if self.running or self.cancelled or not self.active:
+            return
+        self._thread = threading.Thread(target=self.run, daemon=True)
+        self._thread.start()
+
+    def run(self):
+        index = self.index
+        while not self.cancelled and index.generation == self.generation:
+            total = index.line_count()
+            if self.scanned >= total:
+                return
+            end_line = min(total, self.scanned + self.batch_lines)
+            base, data = index.read_range(self.scanned, end_line)
+            self._scan(base, data)
+            self.scanned = end_line
+
+    def _scan(self, base, data):
+        index = self.index
+        last = -1
+        for m in self._primary.finditer(data):
+            line = index.line_at(base + m.start())
+            if line == last:
+                continue
+            last = line
+            if self._others:
+                a = data.rfind(b'\n', 0, m.start()) + 1
+                b = data.find(b'\n', m.end())
+                text = data[a:b if b != -1 else len(data)]
+                if not all(p.search(text) for p in self._others):
+                    continue
+            self.matches.append(line)
+
+
+def _decode(raw):
+    return raw.rstrip(b'\r').decode('utf-8', errors='replace')
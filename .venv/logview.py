@@ -0,0 +1,270 @@
+import tkinter as tk
+from tkinter import ttk
+from tkinter.font import Font
+
+from logindex import LogIndex, LogSearch, LOG_LEVELS
+
+
+class LogViewer:
+    """Virtualized log view: only the lines that fit on screen are ever in the Text widget.
+
+    The file is indexed on a background thread and searched/filtered on
+    another, so opening and scrolling a 1 GB log costs the same as a 1 KB one.
+    """
+
+    POLL_MS = 250
+    SEARCH_DELAY_MS = 200
+
+    def __init__(self, parent, log_path, colors):
+        self.parent = parent
+        self.colors = colors
+        self.index = LogIndex(log_path)
+        self.search = None
+        self.first = 0
+        self.tail = tk.BooleanVar(value=True)
+        self.query = tk.StringVar()
+        self.level = tk.StringVar(value='all')
+        self.component = tk.StringVar()
+        self._search_job = None
+        self._poll_job = None
+        self._rendered = None
+
+        self.setup_ui()
+        self.refresh()
+        self._poll_job = self.text.after(self.POLL_MS, self._poll)
+
+    def setup_ui(self):
+        toolbar = ttk.Frame(self.parent, style='Card.TFrame')
+        toolbar.pack(fill='x', padx=15, pady=(0, 10))
+
+        tk.Label(toolbar, text="Search", bg=self.colors['card'], fg=self.colors['text_secondary']).pack(side='left')
+        search_entry = tk.Entry(
+            toolbar,
+            textvariable=self.query,
+            bg=self.colors['bg'],
+            fg=self.colors['text'],
+            insertbackground=self.colors['text'],
+            borderwidth=0,
+            width=30
+        )
+        search_entry.pack(side='left', padx=(5, 15), ipady=3)
+
+        tk.Label(toolbar, text="Level", bg=self.colors['card'], fg=self.colors['text_secondary']).pack(side='left')
+        level_box = ttk.Combobox(
+            toolbar,
+            textvariable=self.level,
+            values=['all'] + list(LOG_LEVELS),
+            state='readonly',
+            width=8
+        )
+        level_box.pack(side='left', padx=(5, 15))
+
+        tk.Label(toolbar, text="Component", bg=self.colors['card'], fg=self.colors['text_secondary']).pack(side='left')
+        component_entry = tk.Entry(
+            toolbar,
+            textvariable=self.component,
+            bg=self.colors['bg'],
+            fg=self.colors['text'],
+            insertbackground=self.colors['text'],
+            borderwidth=0,
+            width=12
+        )
+        component_entry.pack(side='left', padx=(5, 15), ipady=3)
+
+        tk.Checkbutton(
+            toolbar,
+            text="Tail",
+            variable=self.tail,
+            command=self._on_tail_toggled,
+            bg=self.colors['card'],
+            fg=self.colors['text'],
+            selectcolor=self.colors['bg'],
+            activebackground=self.colors['card']
+        ).pack(side='left')
+
+        self.info_label = tk.Label(toolbar, text="", bg=self.colors['card'], fg=self.colors['text_secondary'])
+        self.info_label.pack(side='right')
+
+        for var in (self.query, self.level, self.component):
+            var.trace_add('write', lambda *_: self._schedule_search())
+
+        text_frame = ttk.Frame(self.parent, style='Card.TFrame')
+        text_frame.pack(expand=True, fill='both', padx=15, pady=(0, 15))
+
+        self.y_scrollbar = ttk.Scrollbar(text_frame, orient='vertical', command=self._on_yview)
+        self.y_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        self.text = tk.Text(
+            text_frame,
+            wrap=tk.NONE,
+            font=('Consolas', 10),
+            bg=self.colors['bg'],
+            fg=self.colors['text'],
+            padx=15,
+            pady=15
+        )
+        self.text.pack(expand=True, fill='both')
+        self.linespace = max(1, Font(font=self.text.cget('font')).metrics('linespace'))
+        x_scrollbar = ttk.Scrollbar(self.text, orient='horizontal', command=self.text.xview)
+        x_scrollbar.pack(side=tk.BOTTOM, fill=tk.X)
+        self.text.configure(xscrollcommand=x_scrollbar.set, state=tk.DISABLED)
+
+        self.text.bind('<Configure>', lambda e: self.render())
+        self.text.bind('<MouseWheel>', lambda e: self.scroll_by(-3 if e.delta > 0 else 3))
+        self.text.bind('<Button-4>', lambda e: self.scroll_by(-3))
+        self.text.bind('<Button-5>', lambda e: self.scroll_by(3))
+        self.text.bind('<Up>', lambda e: self.scroll_by(-1))
+        self.text.bind('<Down>', lambda e: self.scroll_by(1))
+        self.text.bind('<Prior>', lambda e: self.scroll_by(-self.visible_rows()))
+        self.text.bind('<Next>', lambda e: self.scroll_by(self.visible_rows()))
+        self.text.bind('<Control-Home>', lambda e: self.scroll_to(0))
+        self.text.bind('<Control-End>', lambda e: self.scroll_to(self.total()))
+        self.text.bind('<Destroy>', lambda e: self.close() if e.widget is self.text else None)
+
+    # --- Data ---
+
+    def refresh(self):
+        """Re-checks the log file and extends the index over new data."""
+        if self.index.refresh():
+            if self.search is not None and self.search.generation != self.index.generation:
+                # The log was rotated/truncated, so earlier matches are meaningless
+                self._start_search()
+        self.index.build_async()
+        if self.search is not None:
+            self.search.resume()
+        self.render()
+
+    def total(self):
+        if self.search is not None:
+            return len(self.search.matches)
+        return self.index.line_count()
+
+    def visible_rows(self):
+        height = self.text.winfo_height() - 2 * int(self.text.cget('pady'))
+        return max(1, height // self.linespace)
+
+    def fetch(self, rows):
+        if self.search is not None:
+            matches = self.search.matches[self.first:self.first + rows]
+            return self.index.get_line_list(matches)
+        if self.tail.get() and not self.index.complete:
+            # Show the end of the file straight away while indexing catches up
+            return self.index.tail_lines(rows)
+        return self.index.get_lines(self.first, rows)
+
+    # --- Rendering ---
+
+    def render(self):
+        rows = self.visible_rows()
+        total = self.total()
+        if self.tail.get():
+            self.first = max(0, total - rows)
+        self.first = max(0, min(self.first, total - rows))
+
+        if self.index.error is not None:
+            lines = ["Log file not found." if isinstance(self.index.error, FileNotFoundError)
+                     else f"Error reading log file: {self.index.error}"]
+        else:
+            lines = self.fetch(rows)
+
+        key = (self.index.generation, self.first, rows, tuple(lines))
+        if key != self._rendered:
+            self._rendered = key
+            self.text.configure(state=tk.NORMAL)
+            self.text.delete('1.0', tk.END)
+            self.text.insert('1.0', '\n'.join(lines))
+            self.text.configure(state=tk.DISABLED)
+
+        if total:
+            self.y_scrollbar.set(self.first / total, min(1.0, (self.first + rows) / total))
+        else:
+            self.y_scrollbar.set(0.0, 1.0)
+        self._update_info(total)
+
+    def _update_info(self, total):
+        parts = []
+        if not self.index.complete:
+            parts.append(f"Indexing {self.index.progress:.0%}")
+        if self.search is not None:
+            parts.append(f"{total:,} matches")
+            if not self.search_done():
+                parts.append("searching...")
+        else:
+            parts.append(f"{total:,} lines")
+        self.info_label.configure(text="  ".join(parts))
+
+    # --- Scrolling ---
+
+    def scroll_to(self, line):
+        rows = self.visible_rows()
+        total = self.total()
+        self.first = max(0, min(line, total - rows))
+        # Scrolling away from the end leaves tail mode; reaching it re-enters
+        self.tail.set(self.first >= total - rows)
+        self.render()
+        return 'break'
+
+    def scroll_by(self, lines):
+        return self.scroll_to(self.first + lines)
+
+    def _on_yview(self, *args):
+        if args[0] == 'moveto':
+            self.scroll_to(int(float(args[1]) * self.total()))
+        elif args[0] == 'scroll':
+            amount = int(args[1])
+            if args[2] == 'pages':
+                amount *= self.visible_rows()
+            self.scroll_by(amount)
+
+    def _on_tail_toggled(self):
+        self.render()
+
+    # --- Search ---
+
+    def _schedule_search(self):
+        if self._search_job is not None:
+            self.text.after_cancel(self._search_job)
+        self._search_job = self.text.after(self.SEARCH_DELAY_MS, self._start_search)
+
+    def _start_search(self):
+        self._search_job = None
+        if self.search is not None:
+            self.search.cancel()
+        level = self.level.get()
+        search = LogSearch(
+            self.index,
+            query=self.query.get(),
+            level=level if level in LOG_LEVELS else None,
+            component=self.component.get()
+        )
+        self.search = search if search.active else None
+        self.first = 0
+        if self.search is not None:
+            self.search.resume()
+        self.render()
+
+    def search_done(self):
+        """True once the search has covered the whole (fully indexed) file."""
+        search = self.search
+        return not search.running and self.index.complete and search.scanned >= self.index.line_count()
+
+    def _poll(self):
+        self._poll_job = None
+        if self.tail.get():
+            self.refresh()
+        else:
+            # The index may have grown since the search last ran out of lines
+            if self.search is not None and not self.search_done():
+                self.search.resume()
+            # Picks up indexing/search progress; a no-op when nothing changed
+            self.render()
+        self._poll_job = self.text.after(self.POLL_MS, self._poll)
+
+    def close(self):
+        for job in (self._poll_job, self._search_job):
+            if job is not None:
+                self.text.after_cancel(job)
+        self._poll_job = self._search_job = None
+        if self.search is not None:
+            self.search.cancel()
+        self.index.close()
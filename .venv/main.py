@@ -0,0 +1,631 @@
+import tkinter as tk
+from tkinter import ttk, messagebox, filedialog
+import threading
+import os
+import sys
+import time
+from pathlib import Path
+import platform
+from tkinter.font import Font
+import json
+from collections import deque
+from eventbus import UIEventQueue, coalesce
+from logview import LogViewer
+from core import ServiceController
+from registry import RegistryError
+from metrics import MetricsSampler
+from instrument import tracer, StallMonitor
+
+
+class ServiceManager:
+    EVENT_POLL_MS = 50
+    STATUS_LOG_LINES = 500
+    METRICS_REFRESH_MS = 1000
+    SPARKLINE_SIZE = (120, 24)
+
+    def __init__(self):
+        self.root = tk.Tk()
+        self.root.title("DevTools Manager")
+        self.root.geometry("1000x700")
+
+        # --- Set Icon ---
+        icon_path = "favicon.ico"  # Replace with your icon file's path
+
+        if os.path.exists(icon_path):  # Check if the icon file exists
+            if platform.system() == 'Windows':
+                self.root.iconbitmap(icon_path)  # For taskbar and title bar
+            else:
+                # For other platforms (e.g., Linux, macOS)
+                try:
+                    img = tk.PhotoImage(file=icon_path)
+                    self.root.iconphoto(True, img)  # Title Bar
+                except tk.TclError:
+                    print("Warning: Could not load icon on this platform.")
+                    # You could fall back to a default icon here if necessary
+
+        else:
+            print(f"Warning: Icon file not found at {icon_path}")
+        # --- End Set Icon ---
+
+        # Modern dark theme colors
+        self.colors = {
+            'bg': '#1a1b1e',
+            'card': '#25262b',
+            'hover': '#2c2e33',
+            'primary': '#3b82f6',
+            'primary_hover': '#2563eb',
+            'success': '#22c55e',
+            'warning': '#eab308',
+            'error': '#ef4444',
+            'text': '#ffffff',
+            'text_secondary': '#9ca3af',
+            'pending': '#eab308',
+            'running': '#22c55e',
+            'stopped': '#ef4444',
+            'stop_btn': '#ef4444',
+            'restart_btn': '#eab308',
+            'files_btn': '#3b82f6',
+            'logs_btn': '#22c55e'
+        }
+
+        # Initialize variables
+        self.service_status_labels = {}
+        self.metric_widgets = {}
+        self.events = UIEventQueue()
+        self.status_log = deque(maxlen=self.STATUS_LOG_LINES)
+
+        # Service definitions come from services.json; a broken file is reported
+        # here, once, instead of failing later on the first button press.
+        try:
+            self.core = ServiceController(on_status=self.update_status, on_message=self.add_status_message)
+        except RegistryError as e:
+            messagebox.showerror("Service registry", str(e))
+            self.root.destroy()
+            raise SystemExit(1)
+        self.commands = self.core.commands
+        self.supervisor = self.core.supervisor
+        self.metrics = MetricsSampler(self.supervisor)
+        self.closed = False
+
+        # Configure modern styles
+        self.style = ttk.Style()
+        self.style.theme_use('clam')
+        self.setup_styles()
+
+        self.setup_ui()
+        self.core.ensure_service_dirs()  # e.g. nginx's 'temp' folder
+        self.run_in_background(self.core.detect_running_services)
+        self.root.protocol("WM_DELETE_WINDOW", self.on_closing)  # Bind closing event
+        self.root.after(self.EVENT_POLL_MS, self.process_events)
+        self.metrics.start()
+        self.root.after(self.METRICS_REFRESH_MS, self.refresh_metrics)
+        # Only ticks when tracing is on (DEVTOOLS_TRACE)
+        self.stall_monitor = StallMonitor(self.root)
+        self.stall_monitor.start()
+
+    def setup_ui(self):
+        # Main container
+        main_container = ttk.Frame(self.root, style='Dark.TFrame')
+        main_container.pack(expand=True, fill='both', padx=20, pady=20)
+
+        # Header
+        header = ttk.Frame(main_container, style='Dark.TFrame')
+        header.pack(fill='x', pady=(0, 20))
+
+        title = tk.Label(
+            header,
+            text="DevTools Manager",
+            font=('Segoe UI', 24, 'bold'),
+            bg=self.colors['bg'],
+            fg=self.colors['text']
+        )
+        title.pack(side='left')
+
+        # Global actions
+        actions = ttk.Frame(header, style='Dark.TFrame')
+        actions.pack(side='right')
+
+        for action in [("Start All", self.start_all),
+                       ("Stop All", self.stop_all),
+                       ("Restart All", self.restart_all),
+                       ("Export Metrics", self.export_metrics)]:
+            btn = ttk.Button(
+                actions,
+                text=action[0],
+                style='Modern.TButton',
+                command=action[1]
+            )
+            btn.pack(side='left', padx=5)
+
+        # Services grid
+        services_container = self.create_scrollable_frame(main_container)
+
+        for idx, service_name in enumerate(self.commands):
+            self.create_service_card(services_container, service_name, row=idx)
+
+        # Status panel
+        self.setup_status_panel(main_container)
+
+    def create_scrollable_frame(self, parent):
+        """A vertically scrollable frame, so long service lists stay usable."""
+        outer = ttk.Frame(parent, style='Dark.TFrame')
+        outer.pack(fill='both', expand=True)
+
+        canvas = tk.Canvas(outer, bg=self.colors['bg'], highlightthickness=0, borderwidth=0)
+        scrollbar = ttk.Scrollbar(outer, orient='vertical', command=canvas.yview)
+        inner = ttk.Frame(canvas, style='Dark.TFrame')
+        window = canvas.create_window((0, 0), window=inner, anchor='nw')
+
+        def update_scroll(_event=None):
+            canvas.configure(scrollregion=canvas.bbox('all'))
+            if inner.winfo_reqheight() > canvas.winfo_height():
+                scrollbar.pack(side='right', fill='y')
+            else:
+                scrollbar.pack_forget()
+
+        inner.bind('<Configure>', update_scroll)
+        canvas.bind('<Configure>', lambda e: (canvas.itemconfigure(window, width=e.width), update_scroll()))
+        canvas.configure(yscrollcommand=scrollbar.set)
+        canvas.pack(side='left', fill='both', expand=True)
+
+        def on_wheel(event):
+            if inner.winfo_reqheight() > canvas.winfo_height():
+                canvas.yview_scroll(-1 if event.num == 4 or event.delta > 0 else 1, 'units')
+
+        def pointer_inside(event):
+            widget = outer.winfo_containing(event.x_root, event.y_root)
+            return widget is not None and (widget is outer or str(widget).startswith(str(outer) + '.'))
+
+        # The wheel is only grabbed while the pointer is over the list, so the
+        # status log and entries keep scrolling on their own. Button-4/5 are X11.
+        def grab_wheel(_event):
+            for sequence in ('<MouseWheel>', '<Button-4>', '<Button-5>'):
+                canvas.bind_all(sequence, on_wheel)
+
+        def release_wheel(event):
+            # Leave also fires when moving onto a card inside the list
+            if not pointer_inside(event):
+                for sequence in ('<MouseWheel>', '<Button-4>', '<Button-5>'):
+                    canvas.unbind_all(sequence)
+
+        outer.bind('<Enter>', grab_wheel)
+        outer.bind('<Leave>', release_wheel)
+        return inner
+
+    def setup_styles(self):
+        # Main window style
+        self.root.configure(bg=self.colors['bg'])
+
+        # Custom button style
+        self.style.configure(
+            'Modern.TButton',
+            background=self.colors['primary'],
+            foreground=self.colors['text'],
+            padding=(15, 8),
+            font=('Segoe UI', 9),
+            borderwidth=0
+        )
+        self.style.map(
+            'Modern.TButton',
+            background=[('active', self.colors['primary_hover'])]
+        )
+
+        # Secondary button style
+        self.style.configure(
+            'Secondary.TButton',
+            background=self.colors['card'],
+            foreground=self.colors['text'],
+            padding=(12, 6),
+            font=('Segoe UI', 9),
+            borderwidth=0
+        )
+        self.style.map(
+            'Secondary.TButton',
+            background=[('active', self.colors['hover'])]
+        )
+
+        # ---  Colored Button Styles ---
+        self.style.configure(
+            'Stop.TButton',
+            background=self.colors['stop_btn'],
+            foreground=self.colors['text'],
+            padding=(12, 6),
+            font=('Segoe UI', 9),
+            borderwidth=0
+        )
+        self.style.map('Stop.TButton', background=[('active', self.colors['error'])])
+
+        self.style.configure(
+            'Restart.TButton',
+            background=self.colors['restart_btn'],
+            foreground=self.colors['text'],
+            padding=(12, 6),
+            font=('Segoe UI', 9),
+            borderwidth=0
+        )
+        self.style.map('Restart.TButton', background=[('active', self.colors['warning'])])
+
+        self.style.configure(
+            'Files.TButton',
+            background=self.colors['files_btn'],
+            foreground=self.colors['text'],
+            padding=(12, 6),
+            font=('Segoe UI', 9),
+            borderwidth=0
+        )
+        self.style.map('Files.TButton', background=[('active', self.colors['primary'])])
+
+        self.style.configure(
+            'Logs.TButton',
+            background=self.colors['logs_btn'],
+            foreground=self.colors['text'],
+            padding=(12, 6),
+            font=('Segoe UI', 9),
+            borderwidth=0
+        )
+        self.style.map('Logs.TButton', background=[('active', self.colors['success'])])
+
+        # Frame styles
+        self.style.configure(
+            'Dark.TFrame',
+            background=self.colors['bg']
+        )
+        self.style.configure(
+            'Card.TFrame',
+            background=self.colors['card']
+        )
+
+        # Label styles
+        self.style.configure(
+            'Dark.TLabel',
+            background=self.colors['bg'],
+            foreground=self.colors['text'],
+            font=('Segoe UI', 10)
+        )
+
+    def setup_status_panel(self, parent):
+        status_frame = ttk.Frame(parent, style='Card.TFrame')
+        status_frame.pack(fill='x', pady=(20, 0))
+
+        status_header = ttk.Frame(status_frame, style='Card.TFrame')
+        status_header.pack(fill='x', padx=15, pady=10)
+
+        status_label = tk.Label(
+            status_header,
+            text="Status Log",
+            font=('Segoe UI', 12, 'bold'),
+            bg=self.colors['card'],
+            fg=self.colors['text']
+        )
+        status_label.pack(side='left')
+
+        self.status_text = tk.Text(
+            status_frame,
+            height=6,
+            wrap=tk.WORD,
+            font=('Consolas', 9),
+            bg=self.colors['bg'],
+            fg=self.colors['text_secondary'],
+            borderwidth=0,
+            padx=15,
+            pady=10
+        )
+        self.status_text.pack(fill='x', padx=15, pady=(0, 15))
+
+    def create_service_card(self, parent, service_name, row):
+        card = ttk.Frame(parent, style='Card.TFrame')
+        card.pack(fill='x', pady=(0, 10), padx=2)
+
+        # Service header
+        header = ttk.Frame(card, style='Card.TFrame')
+        header.pack(fill='x', padx=15, pady=15)
+
+        icon_label = tk.Label(
+            header,
+            text=self.commands[service_name]['icon'],
+            font=('Segoe UI', 20),
+            bg=self.colors['card'],
+            fg=self.colors['text']
+        )
+        icon_label.pack(side='left')
+
+        name_label = tk.Label(
+            header,
+            text=service_name,
+            font=('Segoe UI', 14, 'bold'),
+            bg=self.colors['card'],
+            fg=self.colors['text']
+        )
+        name_label.pack(side='left', padx=10)
+
+        self.service_status_labels[service_name] = tk.Label(
+            header,
+            text="●",
+            font=('Segoe UI', 14),
+            bg=self.colors['card'],
+            fg=self.colors['error']
+        )
+        self.service_status_labels[service_name].pack(side='right')
+
+        # Action buttons
+        actions = ttk.Frame(card, style='Card.TFrame')
+        actions.pack(fill='x', padx=15, pady=(0, 15))
+
+        buttons = {
+            "Start": (lambda s=service_name: self.start_service(s), 'Modern.TButton'),
+            "Stop": (lambda s=service_name: self.stop_service(s), 'Stop.TButton'),
+            "Restart": (lambda s=service_name: self.restart_service(s), 'Restart.TButton'),
+            "Files": (lambda s=service_name: self.open_explorer(s), 'Files.TButton'),
+            "Logs": (lambda s=service_name: self.show_logs(s), 'Logs.TButton')
+        }
+
+        for text, (command, style) in buttons.items():
+            btn = ttk.Button(
+                actions,
+                text=text,
+                style=style,
+                command=command
+            )
+            btn.pack(side='left', padx=(0, 5))
+
+        # Resource metrics: current values plus CPU and memory sparklines
+        width, height = self.SPARKLINE_SIZE
+        sparklines = {}
+        for field, color in (('rss', self.colors['primary']), ('cpu_percent', self.colors['success'])):
+            canvas = tk.Canvas(
+                actions,
+                width=width,
+                height=height,
+                bg=self.colors['bg'],
+                highlightthickness=0
+            )
+            canvas.pack(side='right', padx=(5, 0))
+            sparklines[field] = (canvas, canvas.create_line(0, height, 0, height, fill=color, width=1.5))
+
+        metrics_label = tk.Label(
+            actions,
+            text="",
+            font=('Consolas', 9),
+            bg=self.colors['card'],
+            fg=self.colors['text_secondary']
+        )
+        metrics_label.pack(side='right', padx=(0, 5))
+        self.metric_widgets[service_name] = (metrics_label, sparklines)
+
+    def refresh_metrics(self):
+        """Redraws the per-service metrics from the sampler's ring buffers."""
+        width, height = self.SPARKLINE_SIZE
+        for service_name, (label, sparklines) in self.metric_widgets.items():
+            metrics = self.metrics.get(service_name)
+            latest = metrics.latest() if metrics and self.supervisor.is_alive(service_name) else None
+            if latest is None:
+                label.configure(text="")
+                for canvas, line in sparklines.values():
+                    canvas.coords(line, 0, height, 0, height)
+                continue
+
+            label.configure(text=(
+                f"CPU {latest['cpu_percent']:5.1f}%  "
+                f"RSS {latest['rss'] / (1024 * 1024):7.1f} MB  "
+                f"Thr {latest['threads']:.0f}  "
+                f"Hnd {latest['handles']:.0f}  "
+                f"I/O {(latest['read_rate'] + latest['write_rate']) / 1024:.0f} KB/s"
+            ))
+            for field, (canvas, line) in sparklines.items():
+                values = metrics.history(field)[-width // 2:]
+                top = max(max(values), 1.0)
+                step = width / max(len(values) - 1, 1)
+                points = []
+                for i, value in enumerate(values):
+                    points += [i * step, height - 1 - (height - 2) * value / top]
+                if len(points) < 4:
+                    points *= 2
+                canvas.coords(line, *points)
+
+        self.root.after(self.METRICS_REFRESH_MS, self.refresh_metrics)
+
+    def export_metrics(self):
+        path = filedialog.asksaveasfilename(
+            title="Export Metrics",
+            defaultextension=".csv",
+            filetypes=[("CSV", "*.csv"), ("JSON", "*.json")]
+        )
+        if not path:
+            return
+        try:
+            if path.lower().endswith('.json'):
+                self.metrics.export_json(path)
+            else:
+                self.metrics.export_csv(path)
+            self.add_status_message(f"Exported metrics to {path}")
+        except OSError as e:
+            self.add_status_message(f"Failed to export metrics: {e}")
+
+    def add_status_message(self, message):
+        # Safe from any thread: the widget is only touched by process_events
+        self.events.post('message', f"[{time.strftime('%H:%M:%S')}] {message}")
+
+    def process_events(self):
+        """Applies queued UI events in one batch on the main loop."""
+        try:
+            messages, statuses, stopped = coalesce(self.events.drain(), lambda: self.closed)
+            if stopped:
+                return
+
+            for service_name, color in statuses.items():
+                self.service_status_labels[service_name].configure(fg=self.colors[color])
+            if messages:
+                self.append_status_lines(messages)
+        finally:
+            # Keep pumping even if an update failed; otherwise later events,
+            # including the close_window queued by on_closing, would never run
+            if not self.closed:
+                self.root.after(self.EVENT_POLL_MS, self.process_events)
+
+    def append_status_lines(self, lines):
+        # The panel is a ring buffer of the last STATUS_LOG_LINES messages,
+        # one Text line each (coalesce() flattens multi-line messages)
+        lines = lines[-self.STATUS_LOG_LINES:]
+        self.status_log.extend(lines)
+        self.status_text.configure(state='normal')
+        self.status_text.insert('end', '\n'.join(lines) + '\n')
+        excess = int(self.status_text.index('end-1c').split('.')[0]) - 1 - len(self.status_log)
+        if excess > 0:
+            self.status_text.delete('1.0', f'{excess + 1}.0')
+        self.status_text.see('end')
+        self.status_text.configure(state='disabled')
+
+    def create_service_panel(self, parent, service_name):
+        frame = ttk.LabelFrame(parent, text=service_name)
+        frame.pack(fill='x', padx=5, pady=5)
+
+        self.service_status_labels[service_name] = ttk.Label(frame, text="●", foreground="red")
+        self.service_status_labels[service_name].pack(side='left', padx=5)
+
+        btn_frame = ttk.Frame(frame)
+        btn_frame.pack(side='right', padx=5)
+
+        buttons = {
+            "Start": lambda s=service_name: self.start_service(s),
+            "Stop": lambda s=service_name: self.stop_service(s),
+            "Restart": lambda s=service_name: self.restart_service(s),
+            "Files": lambda s=service_name: self.open_explorer(s),
+            "Logs": lambda s=service_name: self.show_logs(s)
+        }
+
+        for text, command in buttons.items():
+            ttk.Button(btn_frame, text=text, command=command).pack(side='left', padx=2)
+
+    def create_action_buttons(self, parent):
+        buttons = {
+            "Start All": self.start_all,
+            "Stop All": self.stop_all,
+            "Restart All": self.restart_all
+        }
+
+        for text, command in buttons.items():
+            ttk.Button(parent, text=text, command=command).pack(side='left', padx=5)
+
+    def update_status(self, service_name, status, message=""):
+        status_colors = {
+            'running': 'running',
+            'stopped': 'stopped',
+            'starting': 'pending',
+            'stopping': 'pending',
+            'pending': 'pending',
+            'error': 'stopped'
+        }
+
+        color = status_colors.get(status, 'stopped')
+        self.events.post('status', service_name, color)
+
+        if message:
+            self.add_status_message(f"{service_name}: {message}")
+
+    def run_in_background(self, func, *args):
+        threading.Thread(target=func, args=args, daemon=True).start()
+
+    def start_service(self, service_name):
+        self.run_in_background(self.core.start_service, service_name)
+
+    def stop_service(self, service_name):
+        self.run_in_background(self.core.stop_service, service_name)
+
+    def restart_service(self, service_name):
+        self.add_status_message(f"Restarting {service_name}...")
+        self.run_in_background(self.core.restart, [service_name])
+
+    def start_all(self):
+        self.add_status_message("Starting all services...")
+        self.run_in_background(self.core.start)
+
+    def stop_all(self, on_done=None):
+        self.add_status_message("Stopping all services...")
+
+        def run():
+            self.core.stop()
+            if on_done is not None:
+                self.events.call(on_done)
+
+        self.run_in_background(run)
+
+    def restart_all(self):
+        self.add_status_message("Restarting all services...")
+        self.run_in_background(self.core.restart)
+
+    def open_explorer(self, service_name):
+        service_path = self.commands[service_name]["service_path"]
+        try:
+            path = os.path.abspath(service_path)
+            os.startfile(path)
+            self.add_status_message(f"Opened explorer for {service_name} at {path}")
+        except Exception as e:
+            self.add_status_message(f"Failed to open explorer: {e}")
+
+    def show_logs(self, service_name):
+        log_window = tk.Toplevel(self.root)
+        log_window.title(f"{service_name} Logs")
+        log_window.geometry("900x600")
+        log_window.configure(bg=self.colors['bg'])
+
+        log_frame = ttk.Frame(log_window, style='Card.TFrame')
+        log_frame.pack(expand=True, fill='both', padx=20, pady=20)
+
+        header = ttk.Frame(log_frame, style='Card.TFrame')
+        header.pack(fill='x', padx=15, pady=15)
+
+        title = tk.Label(
+            header,
+            text=f"{self.commands[service_name]['icon']} {service_name} Logs",
+            font=('Segoe UI', 16, 'bold'),
+            bg=self.colors['card'],
+            fg=self.colors['text']
+        )
+        title.pack(side='left')
+
+        refresh_btn = ttk.Button(
+            header,
+            text="Refresh",
+            style='Modern.TButton',
+            command=lambda: self.refresh_logs(viewer, service_name)
+        )
+        refresh_btn.pack(side='right')
+
+        # The first page is rendered inside the constructor, so this is the open time
+        with tracer.span("log-viewer-open", service_name):
+            viewer = LogViewer(log_frame, self.commands[service_name]["log_path"], self.colors)
+
+    def refresh_logs(self, viewer, service_name):
+        # The viewer only re-stats the file and indexes appended bytes, so this
+        # stays cheap no matter how large the log is.
+        with tracer.span("log-viewer-refresh", service_name):
+            viewer.refresh()
+
+    def show_warning(self):
+        messagebox.showerror("Error", "This application only runs on Windows!")
+
+    def cleanup(self):
+        self.add_status_message("Cleaning up and shutting down...")
+        self.stop_all(on_done=self.close_window)  # Close once every service has stopped
+
+    def on_closing(self):
+        """Handles the window closing event."""
+        if self.core.active_services():
+            self.add_status_message("Stopping services before closing...")
+            self.stop_all(on_done=self.close_window)
+        else:
+            self.close_window()
+
+    def close_window(self):
+        self.closed = True
+        self.metrics.stop()
+        tracer.close()
+        self.root.destroy()
+
+    def run(self):
+        self.root.mainloop()
+
+
+if __name__ == "__main__":
+    app = ServiceManager()
+    app.run()
\ No newline at end of file
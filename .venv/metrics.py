@@ -0,0 +1,210 @@
+import csv
+import json
+import time
+import threading
+from array import array
+
+import psutil
+
+from supervisor import children_map
+
+
+METRIC_FIELDS = ('cpu_percent', 'rss', 'handles', 'threads', 'read_rate', 'write_rate')
+
+
+class RingBuffer:
+    """Fixed-size history of floats backed by a preallocated array('d')."""
+
+    def __init__(self, size):
+        self.size = size
+        self.data = array('d', bytes(8 * size))
+        self.count = 0
+        self.pos = 0
+
+    def append(self, value):
+        self.data[self.pos] = value
+        self.pos = (self.pos + 1) % self.size
+        if self.count < self.size:
+            self.count += 1
+
+    def values(self):
+        """Oldest to newest."""
+        if self.count < self.size:
+            return self.data[:self.count].tolist()
+        return (self.data[self.pos:] + self.data[:self.pos]).tolist()
+
+    def last(self, default=0.0):
+        return self.data[(self.pos - 1) % self.size] if self.count else default
+
+
+class ServiceMetrics:
+    """Sample history of one service's process tree."""
+
+    def __init__(self, history):
+        self.lock = threading.Lock()
+        self.timestamps = RingBuffer(history)
+        self.series = {field: RingBuffer(history) for field in METRIC_FIELDS}
+        self.last_io = None
+        self.last_counts = (0.0, 0.0)
+
+    def add(self, timestamp, sample):
+        with self.lock:
+            self.timestamps.append(timestamp)
+            for field in METRIC_FIELDS:
+                self.series[field].append(sample[field])
+
+    def latest(self):
+        with self.lock:
+            if not self.timestamps.count:
+                return None
+            return {field: self.series[field].last() for field in METRIC_FIELDS}
+
+    def history(self, field):
+        with self.lock:
+            return self.series[field].values()
+
+    def rows(self):
+        with self.lock:
+            columns = [self.timestamps.values()] + [self.series[field].values() for field in METRIC_FIELDS]
+        return list(zip(*columns))
+
+
+class MetricsSampler:
+    """Samples CPU, memory, handles, threads and I/O of every supervised
+    process tree from a single background thread.
+
+    psutil.Process objects are kept between samples (cpu_percent needs the
+    previous reading) and each is read inside oneshot(), so one sample costs a
+    handful of system calls per process. Every ``children_every`` samples the
+    child lists are refreshed from a single scan of the process table shared
+    by all services, and the slow-moving handle and thread counts are re-read;
+    in between, those two carry over from the last full sample.
+
+    When a pass costs more CPU than ``max_overhead`` percent of the interval
+    (many large trees, a slow machine) the following wait is stretched, so
+    the sampler stays within that budget instead of slowing everything else.
+    """
+
+    def __init__(self, supervisor, interval=1.0, history=300, children_every=10, max_overhead=0.8):
+        self.supervisor = supervisor
+        self.interval = interval
+        self.max_overhead = max_overhead
+        self.history = history
+        self.children_every = children_every
+        self.metrics = {}
+        # CPU time used by the sampler itself, as a percentage of wall time
+        self.overhead_percent = 0.0
+        self._procs = {}
+        self._cycle = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self.run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def get(self, service_name):
+        return self.metrics.get(service_name)
+
+    def run(self):
+        while not self._stop.is_set():
+            wall_start = time.monotonic()
+            cpu_start = time.thread_time()
+            try:
+                self.sample_all()
+            except Exception:
+                # Sampling is best effort; never let it kill the thread
+                pass
+            elapsed = time.monotonic() - wall_start
+            period = max(self.interval, (time.thread_time() - cpu_start) * 100.0 / self.max_overhead)
+            self._stop.wait(max(0.0, period - elapsed))
+            wall = time.monotonic() - wall_start
+            if wall > 0:
+                self.overhead_percent = 100.0 * (time.thread_time() - cpu_start) / wall
+
+    def sample_all(self):
+        with self.supervisor.lock:
+            records = list(self.supervisor.records.values())
+        refresh_children = self._cycle % self.children_every == 0
+        self._cycle += 1
+
+        tree = children_map() if refresh_children else None
+        now = time.time()
+        seen = set()
+        for record in records:
+            # Set by the supervisor's watcher thread, so this costs no system call
+            if record.exited.is_set():
+                continue
+            if tree is not None:
+                record.refresh_children(tree)
+            procs = [self._cached(proc) for proc in record.tree()]
+            seen.update(proc.pid for proc in procs)
+            metrics = self.metrics.get(record.service_name)
+            if metrics is None:
+                metrics = self.metrics[record.service_name] = ServiceMetrics(self.history)
+            metrics.add(now, self._sample_tree(procs, metrics, now, full=tree is not None))
+
+        # Drop handles of processes that are gone
+        for pid in list(self._procs):
+            if pid not in seen:
+                del self._procs[pid]
+
+    def _cached(self, proc):
+        cached = self._procs.get(proc.pid)
+        if cached is None:
+            cached = self._procs[proc.pid] = proc
+        return cached
+
+    def _sample_tree(self, procs, metrics, now, full=True):
+        sample = dict.fromkeys(METRIC_FIELDS, 0.0)
+        if not full:
+            sample['handles'], sample['threads'] = metrics.last_counts
+        read_bytes = write_bytes = 0
+        for proc in procs:
+            try:
+                with proc.oneshot():
+                    sample['cpu_percent'] += proc.cpu_percent(None)
+                    sample['rss'] += proc.memory_info().rss
+                    if full:
+                        sample['threads'] += proc.num_threads()
+                        if hasattr(proc, 'num_handles'):
+                            sample['handles'] += proc.num_handles()
+                        else:
+                            sample['handles'] += proc.num_fds()
+                    if hasattr(proc, 'io_counters'):
+                        io = proc.io_counters()
+                        read_bytes += io.read_bytes
+                        write_bytes += io.write_bytes
+            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                continue
+        if full:
+            metrics.last_counts = (sample['handles'], sample['threads'])
+
+        # I/O counters are cumulative; store per-second rates
+        if metrics.last_io is not None:
+            last_time, last_read, last_write = metrics.last_io
+            elapsed = now - last_time
+            if elapsed > 0:
+                sample['read_rate'] = max(0.0, (read_bytes - last_read) / elapsed)
+                sample['write_rate'] = max(0.0, (write_bytes - last_write) / elapsed)
+        metrics.last_io = (now, read_bytes, write_bytes)
+        return sample
+
+    def export_csv(self, path):
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(('service', 'timestamp') + METRIC_FIELDS)
+            for service_name, metrics in list(self.metrics.items()):
+                for row in metrics.rows():
+                    writer.writerow((service_name,) + row)
+
+    def export_json(self, path):
+        data = {
+            service_name: [dict(zip(('timestamp',) + METRIC_FIELDS, row)) for row in metrics.rows()]
+            for service_name, metrics in list(self.metrics.items())
+        }
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=2)
@@ -0,0 +1,133 @@
+import threading
+
+
+def check_dependencies(depends_on):
+    """Raises ValueError for unknown dependencies or dependency cycles.
+
+    ``depends_on`` maps service name -> list of the services it needs.
+    """
+    for name, deps in depends_on.items():
+        for dep in deps:
+            if dep not in depends_on:
+                raise ValueError(f"{name} depends on unknown service {dep!r}")
+
+    state = {}
+
+    def visit(name, path):
+        if state.get(name) == 'done':
+            return
+        if state.get(name) == 'visiting':
+            cycle = path[path.index(name):] + [name]
+            raise ValueError(f"Dependency cycle: {' -> '.join(cycle)}")
+        state[name] = 'visiting'
+        for dep in depends_on[name]:
+            visit(dep, path + [name])
+        state[name] = 'done'
+
+    for name in depends_on:
+        visit(name, [])
+
+
+class Orchestrator:
+    """Runs start/stop actions over the service dependency graph.
+
+    ``services`` maps service name -> config; a config may list the services
+    it needs in "depends_on". Independent services run concurrently, a
+    dependent starts only after its dependencies have reported ready, and
+    stops run in the reverse order. ``start_func``/``stop_func`` take a
+    service name, block until the action is finished and return True on
+    success.
+    """
+
+    def __init__(self, services, start_func, stop_func):
+        self.start_func = start_func
+        self.stop_func = stop_func
+        self.depends_on = {
+            name: list(config.get("depends_on", [])) for name, config in services.items()
+        }
+        self.validate()
+
+    def validate(self):
+        """Raises ValueError for unknown dependencies or dependency cycles."""
+        check_dependencies(self.depends_on)
+
+    def with_dependencies(self, names):
+        """``names`` plus everything they (transitively) depend on."""
+        result = []
+
+        def add(name):
+            if name in result:
+                return
+            for dep in self.depends_on[name]:
+                add(dep)
+            result.append(name)
+
+        for name in names:
+            add(name)
+        return result
+
+    def with_dependents(self, names):
+        """``names`` plus everything that (transitively) depends on them."""
+        result = list(names)
+        for name in result:
+            for other, deps in self.depends_on.items():
+                if name in deps and other not in result:
+                    result.append(other)
+        return result
+
+    def dependents(self, name, names):
+        return [other for other in names if name in self.depends_on[other]]
+
+    def start(self, names, on_skipped=None):
+        """Starts ``names`` and their dependencies. Returns {name: success}."""
+        names = self.with_dependencies(names)
+        waits_for = {name: self.depends_on[name] for name in names}
+        return self._run(names, waits_for, self.start_func, require_success=True, on_skipped=on_skipped)
+
+    def stop(self, names):
+        """Stops ``names``, each only after the services depending on it."""
+        names = list(names)
+        waits_for = {name: self.dependents(name, names) for name in names}
+        return self._run(names, waits_for, self.stop_func, require_success=False)
+
+    def restart(self, names, on_skipped=None, active=None):
+        """Restarts ``names`` together with the services depending on them.
+
+        Dependents are stopped first (so they never run against a stopped
+        backend) and started again after their dependencies are back. If
+        ``active`` is given, only services in it are stopped, and dependents
+        outside it are left alone.
+        """
+        affected = self.with_dependents(names)
+        to_stop = [name for name in affected if active is None or name in active]
+        to_start = list(names) + [name for name in to_stop if name not in names]
+        stopped = self.stop(to_stop)
+        if not all(stopped.values()):
+            return {name: False for name in to_start}
+        return self.start(to_start, on_skipped=on_skipped)
+
+    def _run(self, names, waits_for, action, require_success, on_skipped=None):
+        results = {}
+        done = {name: threading.Event() for name in names}
+
+        def worker(name):
+            try:
+                for dep in waits_for[name]:
+                    done[dep].wait()
+                    if require_success and not results.get(dep):
+                        results[name] = False
+                        if on_skipped is not None:
+                            on_skipped(name, dep)
+                        return
+                results[name] = bool(action(name))
+            except Exception:
+                results[name] = False
+            finally:
+                done[name].set()
+
+        threads = [threading.Thread(target=worker, args=(name,), daemon=True) for name in names]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
@@ -0,0 +1,233 @@
+import socket
+import struct
+import time
+import http.client
+from urllib.parse import urlsplit
+
+from logfollow import line_matches
+
+
+class Probe:
+    """A single readiness check. check() must be cheap and must not block for
+    longer than the probe's own timeout."""
+
+    name = 'probe'
+
+    def check(self):
+        raise NotImplementedError
+
+    def __str__(self):
+        return self.name
+
+
+class TCPProbe(Probe):
+    """Ready once a TCP connection to host:port succeeds."""
+
+    def __init__(self, host='127.0.0.1', port=None, timeout=0.5):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.name = f"tcp {host}:{port}"
+
+    def check(self):
+        try:
+            with socket.create_connection((self.host, self.port), timeout=self.timeout):
+                return True
+        except OSError:
+            return False
+
+
+class HTTPProbe(Probe):
+    """Ready once the URL answers with any non-5xx HTTP response."""
+
+    def __init__(self, url='http://127.0.0.1/', timeout=1.0):
+        self.url = url
+        self.timeout = timeout
+        self.name = f"http {url}"
+        parts = urlsplit(url)
+        self._https = parts.scheme == 'https'
+        self._host = parts.hostname or '127.0.0.1'
+        self._port = parts.port
+        self._path = parts.path or '/'
+        if parts.query:
+            self._path += '?' + parts.query
+
+    def check(self):
+        conn_class = http.client.HTTPSConnection if self._https else http.client.HTTPConnection
+        conn = conn_class(self._host, self._port, timeout=self.timeout)
+        try:
+            conn.request('GET', self._path)
+            return conn.getresponse().status < 500
+        except (OSError, http.client.HTTPException):
+            return False
+        finally:
+            conn.close()
+
+
+class MongoPingProbe(Probe):
+    """Ready once mongod answers a ``ping`` over the wire protocol (OP_MSG).
+
+    A listening socket alone is not enough: mongod accepts connections a
+    little before it can run commands.
+    """
+
+    OP_MSG = 2013
+
+    def __init__(self, host='127.0.0.1', port=27017, timeout=1.0):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.name = f"mongo {host}:{port}"
+        self._request_id = 0
+
+    def check(self):
+        self._request_id += 1
+        body = struct.pack('<IB', 0, 0) + _bson_encode({'ping': 1, '$db': 'admin'})
+        message = struct.pack('<iiii', 16 + len(body), self._request_id, 0, self.OP_MSG) + body
+        try:
+            with socket.create_connection((self.host, self.port), timeout=self.timeout) as sock:
+                sock.settimeout(self.timeout)
+                sock.sendall(message)
+                header = _recv_exact(sock, 16)
+                length, _, response_to, op_code = struct.unpack('<iiii', header)
+                if op_code != self.OP_MSG or response_to != self._request_id or length < 21:
+                    return False
+                reply = _recv_exact(sock, length - 16)
+        except (OSError, struct.error):
+            return False
+        # flagBits (4 bytes), section kind 0 (1 byte), then the reply document
+        try:
+            return reply[4] == 0 and _bson_get(reply[5:], 'ok') == 1
+        except (ValueError, IndexError, struct.error):
+            return False
+
+
+class LogPatternProbe(Probe):
+    """Ready once a line matching ``patterns`` is appended to the followed log."""
+
+    def __init__(self, follower, patterns):
+        self.follower = follower
+        self.patterns = patterns
+        self.name = f"log {patterns!r}"
+
+    def check(self):
+        return any(line_matches(line, self.patterns) for line in self.follower.read_new())
+
+
+PROBE_TYPES = {
+    'tcp': lambda spec, follower: TCPProbe(spec.get('host', '127.0.0.1'), spec['port'],
+                                           spec.get('timeout', 0.5)),
+    'http': lambda spec, follower: HTTPProbe(spec.get('url', 'http://127.0.0.1/'), spec.get('timeout', 1.0)),
+    'mongo': lambda spec, follower: MongoPingProbe(spec.get('host', '127.0.0.1'), spec.get('port', 27017),
+                                                   spec.get('timeout', 1.0)),
+    'log': lambda spec, follower: LogPatternProbe(follower, spec['pattern']),
+}
+
+
+def build_probe(spec, follower=None):
+    """Creates a probe from a config entry such as {"type": "tcp", "port": 27017}."""
+    try:
+        factory = PROBE_TYPES[spec['type']]
+    except KeyError:
+        raise ValueError(f"Unknown probe type: {spec.get('type')!r}")
+    return factory(spec, follower)
+
+
+def wait_until_ready(probes, timeout=30.0, alive=None, initial_delay=0.005, max_delay=0.25,
+                     on_attempt=None):
+    """Polls ``probes`` with exponential backoff until all have passed.
+
+    Each probe only has to pass once. Polling starts at ``initial_delay`` and
+    doubles up to ``max_delay``, so a fast service is seen within a few
+    milliseconds while a slow one is not hammered. Gives up when ``timeout``
+    expires or ``alive()`` returns False, including after a round in which
+    every probe passed.
+
+    Returns (ready, pending probes).
+    """
+    pending = list(probes)
+    deadline = time.monotonic() + timeout
+    delay = initial_delay
+    attempt = 0
+    while True:
+        attempt += 1
+        pending = [probe for probe in pending if not probe.check()]
+        if on_attempt is not None:
+            on_attempt(attempt, pending)
+        # Checked before accepting a passing round: another server answering
+        # on the same port must not make a service that exited look ready.
+        if alive is not None and not alive():
+            return False, pending
+        if not pending:
+            return True, pending
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False, pending
+        time.sleep(min(delay, remaining))
+        delay = min(delay * 2, max_delay)
+
+
+def _recv_exact(sock, size):
+    chunks = []
+    while size > 0:
+        chunk = sock.recv(size)
+        if not chunk:
+            raise ConnectionError("connection closed")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b''.join(chunks)
+
+
+def _bson_encode(doc):
+    """Minimal BSON encoder for flat documents of ints and strings."""
+    elements = []
+    for key, value in doc.items():
+        name = key.encode('utf-8') + b'\x00'
+        if isinstance(value, int):
+            elements.append(b'\x10' + name + struct.pack('<i', value))
+        else:
+            data = str(value).encode('utf-8') + b'\x00'
+            elements.append(b'\x02' + name + struct.pack('<i', len(data)) + data)
+    body = b''.join(elements)
+    return struct.pack('<i', len(body) + 5) + body + b'\x00'
+
+
+# Sizes of fixed-width BSON element types; variable-width ones are handled inline
+_BSON_FIXED = {0x01: 8, 0x07: 12, 0x08: 1, 0x09: 8, 0x0A: 0, 0x10: 4, 0x11: 8, 0x12: 8, 0x13: 16, 0x7F: 0, 0xFF: 0}
+
+
+def _bson_get(data, key):
+    """Returns a top-level numeric/bool field from a BSON document, or None."""
+    if len(data) < 5:
+        return None
+    end = min(len(data), struct.unpack_from('<i', data)[0]) - 1
+    pos = 4
+    wanted = key.encode('utf-8')
+    while pos < end:
+        element_type = data[pos]
+        name_end = data.index(b'\x00', pos + 1)
+        name = data[pos + 1:name_end]
+        pos = name_end + 1
+        if name == wanted:
+            if element_type == 0x01:
+                return struct.unpack_from('<d', data, pos)[0]
+            if element_type == 0x10:
+                return struct.unpack_from('<i', data, pos)[0]
+            if element_type == 0x12:
+                return struct.unpack_from('<q', data, pos)[0]
+            if element_type == 0x08:
+                return data[pos] == 1
+            return None
+        if element_type in _BSON_FIXED:
+            pos += _BSON_FIXED[element_type]
+        elif element_type in (0x02, 0x0D, 0x0E):
+            pos += 4 + struct.unpack_from('<i', data, pos)[0]
+        elif element_type in (0x03, 0x04, 0x0F):
+            pos += struct.unpack_from('<i', data, pos)[0]
+        elif element_type == 0x05:
+            pos += 5 + struct.unpack_from('<i', data, pos)[0]
+        elif element_type == 0x0B:
+            pos = data.index(b'\x00', data.index(b'\x00', pos) + 1) + 1
+        else:
+            return None
+    return None
@@ -0,0 +1,178 @@
+import os
+import json
+import platform
+
+from orchestrator import check_dependencies
+from probes import PROBE_TYPES
+
+
+DEFAULT_REGISTRY_PATH = "services.json"
+
+# Keys a service entry may have, and whether they may differ per platform
+SERVICE_KEYS = {
+    "icon": False,
+    "start": True,
+    "stop": True,
+    "process": True,
+    "log_path": True,
+    "service_path": True,
+    "probes": False,
+    "ready_timeout": False,
+    "depends_on": False,
+    "ensure_dirs": True,
+    "instances": False,
+}
+
+# Keys where a value that is exactly one "{var}" placeholder takes the
+# variable's own type; everywhere else (commands in particular) it is text
+TYPED_KEYS = ("probes", "ready_timeout")
+
+
+class RegistryError(ValueError):
+    pass
+
+
+class ServiceRegistry:
+    """Service definitions loaded from a JSON file.
+
+    The file is only read on first access to ``services``; validate() forces
+    that at startup so a broken file is reported once, before any UI is built.
+    """
+
+    def __init__(self, path=None, system=None):
+        self.path = path or os.environ.get("DEVTOOLS_SERVICES", DEFAULT_REGISTRY_PATH)
+        self.system = (system or platform.system()).lower()
+        self._services = None
+
+    @property
+    def services(self):
+        if self._services is None:
+            self._services = load_services(self.path, self.system)
+        return self._services
+
+    def validate(self):
+        return self.services
+
+
+def load_services(path, system):
+    """Reads, expands and validates a registry file. Returns {name: config}."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        raise RegistryError(f"Service registry not found: {os.path.abspath(path)}")
+    except ValueError as e:
+        raise RegistryError(f"Invalid JSON in {path}: {e}")
+
+    entries = data.get("services") if isinstance(data, dict) else None
+    if not isinstance(entries, dict) or not entries:
+        raise RegistryError(f"{path}: expected a non-empty \"services\" object")
+
+    services = {}
+    for name, entry in entries.items():
+        if not isinstance(entry, dict):
+            raise RegistryError(f"{name}: service definition must be an object")
+        unknown = set(entry) - set(SERVICE_KEYS)
+        if unknown:
+            raise RegistryError(f"{name}: unknown keys {', '.join(sorted(unknown))}")
+
+        config = {key: _for_platform(value, system) if SERVICE_KEYS[key] else value
+                  for key, value in entry.items()}
+        instances = config.pop("instances", None)
+        if instances is None:
+            services[name] = config
+            continue
+
+        if not isinstance(instances, list) or not instances:
+            raise RegistryError(f"{name}: \"instances\" must be a non-empty list")
+        for instance in instances:
+            if not isinstance(instance, dict) or "name" not in instance:
+                raise RegistryError(f"{name}: every instance needs a \"name\"")
+            instance_name = f"{name} {instance['name']}"
+            services[instance_name] = {key: _substitute(value, instance, key in TYPED_KEYS)
+                                       for key, value in config.items()}
+
+    for name, config in services.items():
+        _validate_service(name, config, services)
+    try:
+        check_dependencies({name: config.get("depends_on", []) for name, config in services.items()})
+    except ValueError as e:
+        raise RegistryError(str(e))
+    return services
+
+
+def _for_platform(value, system):
+    """Picks the entry for this platform from {"windows": ..., "default": ...}."""
+    if isinstance(value, dict) and ("default" in value or system in value):
+        if system in value:
+            return value[system]
+        return value["default"]
+    return value
+
+
+def _substitute(value, variables, typed=False):
+    """Fills "{var}" placeholders from an instance definition.
+
+    With ``typed``, a string that is exactly one placeholder takes the
+    variable's own type, so a probe's {"port": "{port}"} stays a number while
+    "{port}" in a command line becomes "27017".
+    """
+    if isinstance(value, dict):
+        return {key: _substitute(item, variables, typed) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_substitute(item, variables, typed) for item in value]
+    if isinstance(value, str):
+        if typed and value.startswith('{') and value.endswith('}') and value[1:-1] in variables:
+            return variables[value[1:-1]]
+        try:
+            return value.format_map(variables)
+        except (KeyError, ValueError) as e:
+            raise RegistryError(f"Cannot fill {value!r}: {e}")
+    return value
+
+
+def _validate_service(name, config, services):
+    def fail(message):
+        raise RegistryError(f"{name}: {message}")
+
+    def is_command(value):
+        return isinstance(value, list) and value and all(isinstance(arg, str) for arg in value)
+
+    for key in ("start", "log_path", "service_path"):
+        if key not in config:
+            fail(f"missing \"{key}\"")
+    if not is_command(config["start"]):
+        fail("\"start\" must be a non-empty list of strings")
+    if config.get("stop") is not None and not is_command(config["stop"]):
+        fail("\"stop\" must be null or a non-empty list of strings")
+    for key in ("log_path", "service_path", "icon", "process"):
+        if key in config and not isinstance(config[key], str):
+            fail(f"\"{key}\" must be a string")
+
+    timeout = config.get("ready_timeout", 30)
+    if isinstance(timeout, bool) or not isinstance(timeout, (int, float)) or timeout <= 0:
+        fail("\"ready_timeout\" must be a positive number")
+
+    probes = config.get("probes", [])
+    if not isinstance(probes, list):
+        fail("\"probes\" must be a list")
+    for spec in probes:
+        if not isinstance(spec, dict) or spec.get("type") not in PROBE_TYPES:
+            fail(f"unknown probe {spec!r}; expected one of {', '.join(PROBE_TYPES)}")
+        if spec["type"] == "tcp" and "port" not in spec:
+            fail("tcp probes need a \"port\"")
+        if spec["type"] == "log" and "pattern" not in spec:
+            fail("log probes need a \"pattern\"")
+
+    for key in ("depends_on", "ensure_dirs"):
+        value = config.get(key, [])
+        if not isinstance(value, list) or not all(isinstance(item, str) for item in value):
+            fail(f"\"{key}\" must be a list of strings")
+    for dep in config.get("depends_on", []):
+        if dep not in services:
+            fail(f"depends on unknown service {dep!r}")
+
+    config.setdefault("icon", "⚙")
+    config.setdefault("stop", None)
+    config.setdefault("probes", [])
+    config.setdefault("ready_timeout", timeout)
@@ -0,0 +1,255 @@
+import os
+import shutil
+import platform
+import subprocess
+import threading
+import time
+
+import psutil
+
+
+# How often the watcher of an adopted process checks whether it has exited
+ADOPTED_POLL_INTERVAL = 0.05
+
+
+class SupervisedProcess:
+    """Handles for one running service: the Popen object (when we spawned it)
+    and the psutil.Process of the main process, plus its known children."""
+
+    def __init__(self, service_name, process, popen=None):
+        self.service_name = service_name
+        self.process = process
+        self.popen = popen
+        self.pid = process.pid
+        self.children = []
+        self.returncode = None
+        self.stopping = False
+        self.exited = threading.Event()
+
+    def is_alive(self):
+        if self.exited.is_set():
+            return False
+        try:
+            return self.process.is_running() and self.process.status() != psutil.STATUS_ZOMBIE
+        except psutil.NoSuchProcess:
+            return False
+
+    def refresh_children(self, tree=None):
+        """Re-reads the process tree below the main process (e.g. nginx workers).
+
+        ``tree`` is a map from children_map(); pass one when refreshing many
+        records so the process table is walked once instead of once each.
+        """
+        if tree is None:
+            try:
+                self.children = self.process.children(recursive=True)
+            except psutil.NoSuchProcess:
+                self.children = []
+            return self.children
+
+        children = []
+        pending = [self.pid]
+        while pending:
+            for child in tree.get(pending.pop(), ()):
+                children.append(child)
+                pending.append(child.pid)
+        self.children = children
+        return children
+
+    def tree(self):
+        return [self.process] + list(self.children)
+
+
+def children_map():
+    """Maps parent PID -> child psutil.Process for the whole system, in one scan."""
+    tree = {}
+    for proc in psutil.process_iter(['ppid']):
+        ppid = proc.info['ppid']
+        if ppid is not None and ppid != proc.pid:
+            tree.setdefault(ppid, []).append(proc)
+    return tree
+
+
+class ProcessSupervisor:
+    """Keeps per-service process handles so liveness checks and stop waits do
+    not have to scan the whole process table.
+
+    Each supervised process gets a watcher thread, blocked in wait() for the
+    ones we spawned and polling for adopted ones, which calls
+    ``on_exit(record)`` as soon as the process ends.
+    """
+
+    def __init__(self, on_exit=None):
+        self.on_exit = on_exit
+        self.lock = threading.Lock()
+        self.records = {}
+
+    def spawn(self, service_name, command, cwd=None):
+        windows = platform.system() == 'Windows'
+        popen = subprocess.Popen(
+            command,
+            cwd=cwd,
+            stdin=subprocess.DEVNULL,
+            creationflags=subprocess.CREATE_NO_WINDOW if windows else 0,
+            # Keep services alive when a CLI that started them exits with its terminal
+            start_new_session=not windows
+        )
+        record = SupervisedProcess(service_name, psutil.Process(popen.pid), popen)
+        self._track(record)
+        return record
+
+    def adopt(self, service_name, process):
+        """Takes over a process started outside this supervisor."""
+        record = SupervisedProcess(service_name, process)
+        record.refresh_children()
+        self._track(record)
+        return record
+
+    def adopt_running(self, services):
+        """Finds already running services with a single process table scan.
+
+        ``services`` maps service name -> config with a "start" command and
+        an optional "process" name. A process matches when its executable and
+        arguments equal the start command, so other copies of mongod/nginx on
+        the machine are left alone. Returns the names of the adopted services.
+        """
+        wanted = {}
+        names = set()
+        for service_name, config in services.items():
+            command = config["start"]
+            if self.get(service_name) is None:
+                wanted.setdefault(_resolve_executable(command[0]), []).append((service_name, list(command[1:])))
+                names.add(config.get("process") or os.path.basename(command[0]))
+        if not wanted:
+            return []
+
+        adopted = []
+        for proc in psutil.process_iter(['name', 'exe', 'cmdline']):
+            try:
+                # Cheap name check first; exe/cmdline only matter for candidates
+                if proc.info['name'] not in names:
+                    continue
+                exe = proc.info['exe']
+                if not exe or _normalize_path(exe) not in wanted:
+                    continue
+                args = (proc.info['cmdline'] or [])[1:]
+                for service_name, expected in wanted[_normalize_path(exe)]:
+                    if args == expected and service_name not in adopted:
+                        self.adopt(service_name, proc)
+                        adopted.append(service_name)
+                        break
+            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                pass
+        return adopted
+
+    def _track(self, record):
+        with self.lock:
+            self.records[record.service_name] = record
+        threading.Thread(target=self._watch, args=(record,), daemon=True).start()
+
+    def _watch(self, record):
+        try:
+            if record.popen is not None:
+                record.returncode = record.popen.wait()
+            else:
+                # psutil's wait() only returns once the parent reaps the
+                # process, which may be never (e.g. under a PID 1 that does
+                # not reap). A zombie has exited as far as we are concerned.
+                while not _gone(record.process):
+                    time.sleep(ADOPTED_POLL_INTERVAL)
+        except psutil.NoSuchProcess:
+            pass
+        record.exited.set()
+        if self.on_exit is not None:
+            self.on_exit(record)
+
+    def get(self, service_name):
+        with self.lock:
+            return self.records.get(service_name)
+
+    def is_alive(self, service_name):
+        record = self.get(service_name)
+        return record is not None and record.is_alive()
+
+    def mark_stopping(self, service_name):
+        record = self.get(service_name)
+        if record is not None:
+            record.stopping = True
+            # Remember the workers now, while the main process can still be asked
+            record.refresh_children()
+        return record
+
+    def wait_exit(self, service_name, timeout):
+        """Waits for the service's process tree to exit. Returns True if it did."""
+        record = self.get(service_name)
+        if record is None:
+            return True
+        if not record.exited.wait(timeout):
+            return False
+        _, alive = psutil.wait_procs(record.children, timeout=timeout)
+        if not alive:
+            self.forget(service_name, record)
+        return not alive
+
+    def terminate(self, service_name, timeout=5):
+        """Stops the service's process tree. Returns True once it has exited.
+
+        The main process is asked to exit first (SIGTERM, so mongod can shut
+        down cleanly; TerminateProcess on Windows). Whatever is still running
+        after ``timeout`` seconds, including children it left behind, is killed.
+        """
+        record = self.get(service_name)
+        if record is None:
+            return True
+        record.stopping = True
+        if not record.exited.is_set():
+            record.refresh_children()
+        tree = record.tree()
+        try:
+            record.process.terminate()
+        except psutil.NoSuchProcess:
+            pass
+        record.exited.wait(timeout)
+        for proc in reversed(tree):
+            try:
+                proc.kill()
+            except psutil.NoSuchProcess:
+                pass
+        # Orphaned children linger as zombies until init reaps them, which
+        # wait_procs() would count as alive
+        deadline = time.monotonic() + timeout
+        alive = [proc for proc in tree if not _gone(proc)]
+        while alive and time.monotonic() < deadline:
+            time.sleep(0.01)
+            alive = [proc for proc in alive if not _gone(proc)]
+        if not alive:
+            record.exited.wait(timeout)
+            self.forget(service_name, record)
+        return not alive
+
+    def forget(self, service_name, record=None):
+        with self.lock:
+            if record is None or self.records.get(service_name) is record:
+                self.records.pop(service_name, None)
+
+
+def _normalize_path(path):
+    return os.path.normcase(os.path.realpath(path))
+
+
+def _resolve_executable(command):
+    """Normalized path of the program Popen would run for ``command``.
+
+    Bare names such as "mongod" are looked up on PATH first; realpath alone
+    would turn them into a file in the current directory.
+    """
+    if not os.path.dirname(command):
+        command = shutil.which(command) or command
+    return _normalize_path(command)
+
+
+def _gone(proc):
+    try:
+        return not proc.is_running() or proc.status() == psutil.STATUS_ZOMBIE
+    except psutil.NoSuchProcess:
+        return True
@@ -0,0 +1,175 @@
+import json
+import threading
+import http.client
+
+import pytest
+
+from daemon import ControlClient, ControlServer
+
+
+class StubController:
+    """Records control calls and answers them as if every service started."""
+
+    def __init__(self, log_path):
+        self.commands = {"MongoDB": {"log_path": log_path}, "Nginx": {"log_path": log_path}}
+        self.calls = []
+
+    def status(self):
+        return {name: {"status": "Stopped", "pid": None} for name in self.commands}
+
+    def action(self, kind):
+        def run(names=None):
+            self.calls.append((kind, names))
+            return {name: True for name in names or self.commands}
+        return run
+
+    @property
+    def start(self):
+        return self.action("start")
+
+    @property
+    def stop(self):
+        return self.action("stop")
+
+    @property
+    def restart(self):
+        return self.action("restart")
+
+
+@pytest.fixture
+def log_file(tmp_path):
+    path = tmp_path / "service.log"
+    path.write_bytes(b"one\ntwo\nthree\n")
+    return path
+
+
+@pytest.fixture
+def server(log_file):
+    server = ControlServer(StubController(str(log_file)), "127.0.0.1:0")
+    thread = threading.Thread(target=server.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def client(server):
+    return ControlClient(f"127.0.0.1:{server.server_address[1]}")
+
+
+def raw(server, method, path, body=None, headers=None):
+    """Sends a request with exactly the given body and headers. Returns (status, json)."""
+    conn = http.client.HTTPConnection(*server.server_address, timeout=5)
+    try:
+        conn.request(method, path, body=body, headers=headers or {})
+        response = conn.getresponse()
+        return response.status, json.loads(response.read())
+    finally:
+        conn.close()
+
+
+def post(server, path, body):
+    return raw(server, 'POST', path, body, {'Content-Type': 'application/json'})
+
+
+def test_status(client):
+    assert client.available()
+    assert set(client.status()) == {"MongoDB", "Nginx"}
+
+
+def test_control_passes_names(client, server):
+    assert client.control("restart", ["Nginx"]) == {"Nginx": True}
+    assert client.control("stop") == {"MongoDB": True, "Nginx": True}
+    assert server.controller.calls == [("restart", ["Nginx"]), ("stop", None)]
+
+
+def test_logs_tail_then_follow(client, log_file):
+    lines, offset = client.logs("MongoDB", tail=2)
+    assert lines == ["two", "three"]
+    assert offset == log_file.stat().st_size
+
+    assert client.logs("MongoDB", offset) == ([], offset)
+    with open(log_file, 'ab') as f:
+        f.write(b"four\n")
+    lines, offset = client.logs("MongoDB", offset)
+    assert lines == ["four"]
+    assert offset == log_file.stat().st_size
+
+
+def test_logs_from_offset(client):
+    assert client.logs("MongoDB") == (["one", "two", "three"], 14)
+    assert client.logs("MongoDB", 4) == (["two", "three"], 14)
+
+
+@pytest.mark.parametrize("query", [
+    "service=MongoDB&offset=abc",
+    "service=MongoDB&tail=x",
+    "service=MongoDB&offset=-1",
+    "service=MongoDB&tail=-5",
+])
+def test_logs_rejects_bad_numbers(server, query):
+    status, data = raw(server, 'GET', f'/logs?{query}')
+    assert status == 400
+    assert "error" in data
+
+
+@pytest.mark.parametrize("path", ['/logs?service=Redis', '/logs', '/nothing'])
+def test_get_not_found(server, path):
+    assert raw(server, 'GET', path)[0] == 404
+
+
+@pytest.mark.parametrize("body, error", [
+    (b'{not json', "Invalid JSON"),
+    (b'["MongoDB"]', "JSON object"),
+    (b'{"services": "MongoDB"}', "list of service names"),
+    (b'{"services": ["MongoDB", 1]}', "list of service names"),
+])
+def test_post_rejects_bad_bodies(server, body, error):
+    status, data = post(server, '/start', body)
+    assert status == 400
+    assert error in data["error"]
+    assert server.controller.calls == []
+
+
+def test_post_not_found(server):
+    assert post(server, '/launch', b'{}')[0] == 404
+    status, data = post(server, '/start', b'{"services": ["MongoDB", "Redis"]}')
+    assert status == 404
+    assert "Redis" in data["error"]
+    assert server.controller.calls == []
+
+
+def test_post_without_body_means_all_services(server):
+    status, data = post(server, '/start', b'')
+    assert status == 200
+    assert server.controller.calls == [("start", None)]
+
+
+def test_post_requires_json_content_type(server):
+    # What a page can send cross-origin without a preflight
+    status, _ = raw(server, 'POST', '/start', b'{"services": ["MongoDB"]}', {'Content-Type': 'text/plain'})
+    assert status == 415
+    assert raw(server, 'POST', '/shutdown')[0] == 415
+    assert server.controller.calls == []
+
+
+@pytest.mark.parametrize("headers", [
+    {'Host': 'evil.example:8765'},
+    {'Host': 'localhost:1'},
+    {'Origin': 'http://evil.example'},
+])
+def test_rejects_browser_requests(server, headers):
+    assert raw(server, 'GET', '/logs?service=MongoDB', headers=headers)[0] == 403
+    headers = dict(headers, **{'Content-Type': 'application/json'})
+    assert raw(server, 'POST', '/stop', b'{}', headers)[0] == 403
+    assert server.controller.calls == []
+
+
+def test_accepts_localhost_host(server):
+    port = server.server_address[1]
+    assert raw(server, 'GET', '/status', headers={'Host': f'localhost:{port}'})[0] == 200
+
+
+def test_shutdown(server, client):
+    assert client.request('POST', '/shutdown') == {"ok": True}
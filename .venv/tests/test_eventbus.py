@@ -0,0 +1,111 @@
+import threading
+from collections import deque
+from types import SimpleNamespace
+
+import pytest
+
+from eventbus import UIEventQueue, coalesce
+
+
+def test_drain_in_order_and_bounded():
+    events = UIEventQueue()
+    for i in range(5):
+        events.post('message', str(i))
+    assert events.drain(max_events=3) == [('message', ('0',)), ('message', ('1',)), ('message', ('2',))]
+    assert events.drain() == [('message', ('3',)), ('message', ('4',))]
+    assert events.drain() == []
+
+
+def test_post_from_threads():
+    events = UIEventQueue()
+    threads = [threading.Thread(target=lambda: [events.post('status', 'svc', 'green') for _ in range(100)])
+               for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(events.drain()) == 400
+
+
+def test_coalesce_keeps_latest_status_per_service():
+    events = UIEventQueue()
+    events.post('status', 'MongoDB', 'orange')
+    events.post('status', 'Nginx', 'orange')
+    events.post('message', 'starting')
+    events.post('status', 'MongoDB', 'green')
+    messages, statuses, stopped = coalesce(events.drain())
+    assert messages == ['starting']
+    assert statuses == {'MongoDB': 'green', 'Nginx': 'orange'}
+    assert not stopped
+
+
+def test_coalesce_flattens_multiline_messages():
+    events = UIEventQueue()
+    events.post('message', 'Error starting MongoDB: Traceback\n  line 1\r\n  line 2\n')
+    messages, _, _ = coalesce(events.drain())
+    assert messages == ['Error starting MongoDB: Traceback   line 1   line 2']
+
+
+def test_coalesce_runs_calls_in_order_and_reports_failures():
+    calls = []
+    events = UIEventQueue()
+    events.call(calls.append, 1)
+    events.call(lambda: 1 / 0)
+    events.post('message', 'after')
+    events.call(calls.append, 2)
+    messages, _, stopped = coalesce(events.drain())
+    assert calls == [1, 2]
+    assert len(messages) == 2
+    assert 'UI update failed: division by zero' in messages[0]
+    assert messages[1] == 'after'
+    assert not stopped
+
+
+def test_coalesce_stops_once_closed():
+    state = {'closed': False}
+    calls = []
+    events = UIEventQueue()
+    events.call(calls.append, 1)
+    events.call(lambda: state.update(closed=True))
+    events.call(calls.append, 2)
+    events.post('message', 'dropped')
+    _, _, stopped = coalesce(events.drain(), lambda: state['closed'])
+    assert stopped
+    assert calls == [1]
+
+
+# --- Status panel (needs a display) ---
+
+@pytest.fixture
+def status_panel():
+    tk = pytest.importorskip('tkinter')
+    try:
+        root = tk.Tk()
+    except tk.TclError:
+        pytest.skip("no display")
+    import main
+    panel = SimpleNamespace(STATUS_LOG_LINES=5, status_log=deque(maxlen=5), status_text=tk.Text(root))
+    panel.append = lambda lines: main.ServiceManager.append_status_lines(panel, lines)
+    yield panel
+    root.destroy()
+
+
+def panel_lines(panel):
+    return panel.status_text.get('1.0', 'end-1c').splitlines()
+
+
+def test_status_panel_keeps_last_lines(status_panel):
+    status_panel.append(['a', 'b', 'c'])
+    status_panel.append(['d', 'e', 'f', 'g'])
+    assert panel_lines(status_panel) == ['c', 'd', 'e', 'f', 'g']
+    status_panel.append([str(i) for i in range(20)])
+    assert panel_lines(status_panel) == ['15', '16', '17', '18', '19']
+
+
+def test_status_panel_with_flattened_multiline_message(status_panel):
+    events = UIEventQueue()
+    for i in range(6):
+        events.post('message', f"error {i}\nwith detail")
+    messages, _, _ = coalesce(events.drain())
+    status_panel.append(messages)
+    assert panel_lines(status_panel) == [f"error {i} with detail" for i in range(1, 6)]
@@ -0,0 +1,138 @@
+import json
+
+import pytest
+
+import instrument
+from bench import pair_spans, percentile, summarize
+from instrument import Tracer
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+        self.wall_reads = 0
+
+    def time(self):
+        self.wall_reads += 1
+        return 1700000000.0 + self.now
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(instrument, 'time', clock)
+    return clock
+
+
+# --- Tracer ---
+
+def test_disabled_tracer_does_nothing(clock):
+    tracer = Tracer()
+    assert not tracer.enabled
+    tracer.event("spawn", "MongoDB", pid=1)
+    with tracer.span("stop", "MongoDB"):
+        clock.now += 1
+    # Every emitted record reads the wall clock; none was built
+    assert clock.wall_reads == 0
+    assert tracer.path is None
+
+
+def test_listener_receives_events(clock):
+    tracer = Tracer()
+    events = []
+    tracer.listeners.append(events.append)
+    assert tracer.enabled
+    tracer.event("spawn", "MongoDB", pid=42)
+    tracer.event("ui-stall")
+    assert events == [
+        {"ts": 1700000100.0, "mono": 100.0, "event": "spawn", "service": "MongoDB", "pid": 42},
+        {"ts": 1700000100.0, "mono": 100.0, "event": "ui-stall"},
+    ]
+
+
+def test_span_reports_duration_even_on_error(clock):
+    tracer = Tracer()
+    events = []
+    tracer.listeners.append(events.append)
+    with pytest.raises(RuntimeError):
+        with tracer.span("verify", "Nginx", attempt=1):
+            clock.now += 0.25
+            raise RuntimeError("boom")
+    assert len(events) == 1
+    assert events[0]["event"] == "verify"
+    assert events[0]["duration_ms"] == pytest.approx(250.0)
+    assert events[0]["attempt"] == 1
+
+
+def test_file_output(tmp_path):
+    path = tmp_path / "trace.jsonl"
+    tracer = Tracer(str(path))
+    tracer.event("start-requested", "MongoDB")
+    tracer.event("ready", "MongoDB")
+    tracer.close()
+    assert not tracer.enabled
+    tracer.event("ignored")
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [record["event"] for record in records] == ["start-requested", "ready"]
+    assert records[1]["mono"] >= records[0]["mono"]
+
+
+# --- pair_spans ---
+
+def event(name, service, mono):
+    return {"event": name, "service": service, "mono": mono}
+
+
+def test_pair_spans_interleaved_services():
+    events = [
+        event("start-requested", "MongoDB", 0.0),
+        event("start-requested", "Nginx", 0.5),
+        event("spawn", "Nginx", 0.6),
+        event("ready", "Nginx", 1.0),
+        event("ready", "MongoDB", 2.0),
+        # An end without a begin is ignored
+        event("ready", "MongoDB", 3.0),
+        event("start-requested", "MongoDB", 4.0),
+        event("ready", "MongoDB", 4.1),
+    ]
+    spans = pair_spans(events, "start-requested", "ready")
+    assert spans.keys() == {"MongoDB", "Nginx"}
+    assert spans["MongoDB"] == pytest.approx([2000.0, 100.0])
+    assert spans["Nginx"] == pytest.approx([500.0])
+
+
+def test_pair_spans_restarted_begin_and_unfinished():
+    events = [
+        event("stop-requested", "MongoDB", 0.0),
+        # A second begin replaces the first
+        event("stop-requested", "MongoDB", 1.0),
+        event("stopped", "MongoDB", 1.5),
+        event("stop-requested", "Nginx", 2.0),
+    ]
+    assert pair_spans(events, "stop-requested", "stopped") == {"MongoDB": pytest.approx([500.0])}
+
+
+# --- percentile ---
+
+def test_percentile_nearest_rank():
+    values = [10, 1, 9, 2, 8, 3, 7, 4, 6, 5]
+    assert percentile(values, 50) == 5
+    assert percentile(values, 90) == 9
+    assert percentile(values, 91) == 10
+    assert percentile(values, 99) == 10
+    assert percentile(values, 100) == 10
+    assert percentile(values, 0) == 1
+
+
+def test_percentile_small_samples():
+    assert percentile([42], 50) == 42
+    assert percentile([42], 99) == 42
+    assert percentile([1, 2], 50) == 1
+    assert percentile([1, 2], 51) == 2
+
+
+def test_summarize():
+    assert summarize([4.0, 1.0, 3.0, 2.0]) == {"n": 4, "p50": 2.0, "p99": 4.0, "mean": 2.5, "max": 4.0}
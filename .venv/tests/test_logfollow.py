@@ -0,0 +1,85 @@
+import os
+
+from logfollow import LogFollower, line_matches, log_message
+
+
+def append(path, data):
+    with open(path, 'ab') as f:
+        f.write(data)
+
+
+def test_reads_only_appended_lines(tmp_path):
+    log = tmp_path / "mongo.log"
+    append(log, b"one\ntwo\n")
+    follower = LogFollower(str(log))
+    assert follower.read_new() == ["one", "two"]
+    assert follower.read_new() == []
+    append(log, b"three\n")
+    assert follower.read_new() == ["three"]
+
+
+def test_partial_line_is_held_back(tmp_path):
+    log = tmp_path / "mongo.log"
+    append(log, b"done\nhal")
+    follower = LogFollower(str(log))
+    assert follower.read_new() == ["done"]
+    assert follower.position == len(b"done\n")
+    append(log, b"f\r\n")
+    assert follower.read_new() == ["half"]
+    assert follower.position == os.path.getsize(log)
+
+
+def test_from_end_skips_existing_lines(tmp_path):
+    log = tmp_path / "mongo.log"
+    append(log, b"old run: Waiting for connections\n")
+    follower = LogFollower(str(log), from_end=True)
+    assert follower.read_new() == []
+    append(log, b"new\n")
+    assert follower.read_new() == ["new"]
+
+
+def test_missing_file_then_created(tmp_path):
+    log = tmp_path / "mongo.log"
+    follower = LogFollower(str(log), from_end=True)
+    assert follower.read_new() == []
+    append(log, b"first\n")
+    assert follower.read_new() == ["first"]
+
+
+def test_truncation_restarts_from_top(tmp_path):
+    log = tmp_path / "mongo.log"
+    append(log, b"a long line before truncation\n")
+    follower = LogFollower(str(log))
+    follower.read_new()
+    log.write_bytes(b"x\n")
+    assert follower.read_new() == ["x"]
+
+
+def test_rotation_restarts_from_top(tmp_path):
+    log = tmp_path / "mongo.log"
+    append(log, b"before\n")
+    follower = LogFollower(str(log))
+    follower.read_new()
+    os.rename(log, tmp_path / "mongo.log.1")
+    # Same size or bigger, so only the file identity gives the rotation away
+    append(log, b"after rotation\n")
+    assert follower.read_new() == ["after rotation"]
+
+
+def test_max_bytes_limits_one_read(tmp_path):
+    log = tmp_path / "mongo.log"
+    append(log, b"aaaa\nbbbb\ncccc\n")
+    follower = LogFollower(str(log), chunk_size=2)
+    assert follower.read_new(max_bytes=7) == ["aaaa"]
+    assert follower.read_new() == ["bbbb", "cccc"]
+
+
+def test_log_message_and_line_matches():
+    json_line = '{"s":"I","c":"NETWORK","msg":"Listening on","attr":{"address":"Waiting for connections"}}'
+    assert log_message(json_line) == "Listening on"
+    assert log_message("plain nginx line") == "plain nginx line"
+    assert log_message("{not json") == "{not json"
+    # Only the message counts for JSON lines, not text in other fields
+    assert not line_matches(json_line, "Waiting for connections")
+    assert line_matches(json_line, ("nope", "Listening"))
+    assert line_matches("2024/01/01 [notice] start worker processes", "start worker")
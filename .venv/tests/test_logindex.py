@@ -0,0 +1,153 @@
+import os
+
+import pytest
+
+from logindex import LogIndex, LogSearch
+
+
+def make_index(path, data, chunk_size=7):
+    path.write_bytes(data)
+    index = LogIndex(str(path), chunk_size=chunk_size)
+    index.refresh()
+    index.build()
+    return index
+
+
+LINES = [f"line {i} " + "x" * (i % 5) for i in range(50)]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 7, 64, 4096])
+def test_offsets_across_chunk_boundaries(tmp_path, chunk_size):
+    index = make_index(tmp_path / "a.log", "\n".join(LINES).encode() + b"\n", chunk_size)
+    assert index.complete
+    assert index.line_count() == len(LINES)
+    assert index.get_lines(0, len(LINES)) == LINES
+    assert index.get_lines(48, 10) == LINES[48:]
+    assert index.get_line_list([3, 0, 49]) == [LINES[3], LINES[0], LINES[49]]
+
+
+def test_unterminated_last_line_and_blank_lines(tmp_path):
+    index = make_index(tmp_path / "a.log", b"a\n\nb\r\nlast")
+    assert index.line_count() == 4
+    assert index.get_lines(0, 10) == ["a", "", "b", "last"]
+
+
+def test_empty_file(tmp_path):
+    index = make_index(tmp_path / "a.log", b"")
+    assert index.line_count() == 0
+    assert index.get_lines(0, 10) == []
+    assert index.tail_lines(5) == []
+
+
+@pytest.mark.parametrize("data, count, expected", [
+    (b"a\nb\nc\n", 2, ["b", "c"]),
+    (b"a\nb\nc", 2, ["b", "c"]),
+    (b"a\nb\nc\n", 3, ["a", "b", "c"]),
+    (b"a\nb\nc\n", 10, ["a", "b", "c"]),
+    (b"only\n", 1, ["only"]),
+])
+def test_tail_lines_without_index(tmp_path, data, count, expected):
+    path = tmp_path / "a.log"
+    path.write_bytes(data)
+    index = LogIndex(str(path))
+    index.refresh()
+    assert not index.complete
+    assert index.tail_lines(count) == expected
+
+
+def test_line_at_and_read_range(tmp_path):
+    index = make_index(tmp_path / "a.log", b"aa\nbbb\nc\n")
+    assert [index.line_at(offset) for offset in (0, 2, 3, 6, 7)] == [0, 0, 1, 1, 2]
+    base, data = index.read_range(1, 3)
+    assert base == 3
+    assert data == b"bbb\nc"
+
+
+def test_appended_data_extends_index(tmp_path):
+    path = tmp_path / "a.log"
+    index = make_index(path, b"a\nb\n")
+    generation = index.generation
+    with open(path, 'ab') as f:
+        f.write(b"c\n")
+    assert index.refresh()
+    assert not index.refresh()
+    index.build()
+    assert index.get_lines(0, 10) == ["a", "b", "c"]
+    assert index.generation == generation
+
+
+def test_truncation_and_rotation_reset_the_index(tmp_path):
+    path = tmp_path / "a.log"
+    index = make_index(path, b"first\nsecond\n")
+    generation = index.generation
+
+    path.write_bytes(b"x\n")
+    assert index.refresh()
+    index.build()
+    assert index.get_lines(0, 10) == ["x"]
+    assert index.generation == generation + 1
+
+    os.rename(path, tmp_path / "a.log.1")
+    path.write_bytes(b"rotated\n")
+    assert index.refresh()
+    index.build()
+    assert index.get_lines(0, 10) == ["rotated"]
+    assert index.generation == generation + 2
+
+
+def test_reads_after_unnoticed_rotation_return_nothing(tmp_path):
+    path = tmp_path / "a.log"
+    index = make_index(path, b"old\n")
+    os.rename(path, tmp_path / "a.log.1")
+    path.write_bytes(b"new\n")
+    # Until refresh() sees the new file, its bytes must not be read with old offsets
+    assert index.get_lines(0, 1) == []
+    assert index.tail_lines(1) == []
+
+
+def test_missing_file_sets_error(tmp_path):
+    index = LogIndex(str(tmp_path / "missing.log"))
+    assert index.refresh()
+    assert index.error is not None
+    assert index.get_lines(0, 1) == []
+    (tmp_path / "missing.log").write_bytes(b"here\n")
+    assert index.refresh()
+    assert index.error is None
+
+
+def test_search_by_query_level_and_component(tmp_path):
+    lines = [
+        '{"s":"I","c":"NETWORK","msg":"Connection accepted"}',
+        '{"s":"E","c":"STORAGE","msg":"Disk full"}',
+        '2024/01/01 10:00:00 [error] 12#0: upstream timed out',
+        '{"s":"W","c":"NETWORK","msg":"Slow connection"}',
+        '{"s":"E","c":"NETWORK","msg":"Connection reset"}',
+    ]
+    index = make_index(tmp_path / "a.log", "\n".join(lines).encode() + b"\n", chunk_size=16)
+
+    def search(**kwargs):
+        s = LogSearch(index, batch_lines=2, **kwargs)
+        s.run()
+        return list(s.matches)
+
+    assert search(query="connection") == [0, 3, 4]
+    assert search(level="error") == [1, 2, 4]
+    assert search(level="warning") == [3]
+    assert search(component="network") == [0, 3, 4]
+    assert search(level="error", component="NETWORK") == [4]
+    assert not LogSearch(index).active
+
+
+def test_search_resumes_over_appended_lines(tmp_path):
+    path = tmp_path / "a.log"
+    index = make_index(path, b"hit 1\nmiss\n")
+    search = LogSearch(index, query="hit")
+    search.run()
+    assert list(search.matches) == [0]
+    with open(path, 'ab') as f:
+        f.write(b"hit 2\n")
+    index.refresh()
+    index.build()
+    search.run()
+    assert list(search.matches) == [0, 2]
+    assert search.scanned == index.line_count()
@@ -0,0 +1,183 @@
+import csv
+import json
+import contextlib
+from collections import namedtuple
+
+import psutil
+import pytest
+
+from metrics import METRIC_FIELDS, MetricsSampler, RingBuffer, ServiceMetrics
+
+
+# --- RingBuffer ---
+
+def test_ring_buffer_before_wrap():
+    buffer = RingBuffer(4)
+    assert buffer.values() == []
+    assert buffer.last() == 0.0
+    assert buffer.last(default=None) is None
+    buffer.append(1)
+    buffer.append(2)
+    assert buffer.values() == [1.0, 2.0]
+    assert buffer.last() == 2.0
+
+
+def test_ring_buffer_wraps_oldest_first():
+    buffer = RingBuffer(3)
+    for value in range(1, 8):
+        buffer.append(value)
+    assert buffer.count == 3
+    assert buffer.values() == [5.0, 6.0, 7.0]
+    assert buffer.last() == 7.0
+
+
+def test_ring_buffer_exactly_full():
+    buffer = RingBuffer(3)
+    for value in (1, 2, 3):
+        buffer.append(value)
+    assert buffer.pos == 0
+    assert buffer.values() == [1.0, 2.0, 3.0]
+    assert buffer.last() == 3.0
+
+
+# --- ServiceMetrics ---
+
+def sample(**values):
+    return dict(dict.fromkeys(METRIC_FIELDS, 0.0), **values)
+
+
+def test_service_metrics_history_and_rows():
+    metrics = ServiceMetrics(history=2)
+    assert metrics.latest() is None
+    metrics.add(10.0, sample(rss=1))
+    metrics.add(11.0, sample(rss=2))
+    metrics.add(12.0, sample(rss=3, cpu_percent=50))
+    assert metrics.history('rss') == [2.0, 3.0]
+    assert metrics.latest()['cpu_percent'] == 50.0
+    assert [row[:3] for row in metrics.rows()] == [(11.0, 0.0, 2.0), (12.0, 50.0, 3.0)]
+
+
+# --- _sample_tree ---
+
+IO = namedtuple('IO', 'read_bytes write_bytes')
+Memory = namedtuple('Memory', 'rss')
+
+
+class FakeProcess:
+    def __init__(self, cpu=0.0, rss=0, fds=0, threads=1, read=0, write=0, gone=False):
+        self.cpu, self.rss, self.fds, self.threads = cpu, rss, fds, threads
+        self.read, self.write = read, write
+        self.gone = gone
+        self.thread_reads = 0
+
+    def oneshot(self):
+        return contextlib.nullcontext()
+
+    def cpu_percent(self, interval):
+        if self.gone:
+            raise psutil.NoSuchProcess(1)
+        return self.cpu
+
+    def memory_info(self):
+        return Memory(self.rss)
+
+    def num_threads(self):
+        self.thread_reads += 1
+        return self.threads
+
+    def num_fds(self):
+        return self.fds
+
+    def io_counters(self):
+        return IO(self.read, self.write)
+
+
+@pytest.fixture
+def sampler():
+    return MetricsSampler(supervisor=None)
+
+
+def test_sample_tree_sums_processes(sampler):
+    metrics = ServiceMetrics(10)
+    procs = [FakeProcess(cpu=10, rss=100, fds=5, threads=2), FakeProcess(cpu=5, rss=50, fds=3, threads=4),
+             FakeProcess(cpu=99, rss=999, gone=True)]
+    result = sampler._sample_tree(procs, metrics, now=100.0)
+    assert result['cpu_percent'] == 15
+    assert result['rss'] == 150
+    assert result['handles'] == 8
+    assert result['threads'] == 6
+    # No previous reading to compute a rate from
+    assert result['read_rate'] == result['write_rate'] == 0.0
+
+
+def test_sample_tree_io_rates(sampler):
+    metrics = ServiceMetrics(10)
+    proc = FakeProcess(read=1000, write=0)
+    sampler._sample_tree([proc], metrics, now=100.0)
+    proc.read, proc.write = 3000, 500
+    result = sampler._sample_tree([proc], metrics, now=102.0)
+    assert result['read_rate'] == 1000.0
+    assert result['write_rate'] == 250.0
+
+
+def test_sample_tree_counter_reset_is_not_negative(sampler):
+    # A restarted process starts its cumulative counters from zero again
+    metrics = ServiceMetrics(10)
+    proc = FakeProcess(read=5000, write=5000)
+    sampler._sample_tree([proc], metrics, now=100.0)
+    proc.read, proc.write = 100, 0
+    result = sampler._sample_tree([proc], metrics, now=101.0)
+    assert result['read_rate'] == 0.0
+    assert result['write_rate'] == 0.0
+    proc.read = 600
+    assert sampler._sample_tree([proc], metrics, now=102.0)['read_rate'] == 500.0
+
+
+def test_sample_tree_same_timestamp(sampler):
+    metrics = ServiceMetrics(10)
+    proc = FakeProcess(read=0)
+    sampler._sample_tree([proc], metrics, now=100.0)
+    proc.read = 100
+    assert sampler._sample_tree([proc], metrics, now=100.0)['read_rate'] == 0.0
+
+
+def test_sample_tree_carries_counts_between_full_samples(sampler):
+    metrics = ServiceMetrics(10)
+    proc = FakeProcess(fds=7, threads=3)
+    sampler._sample_tree([proc], metrics, now=100.0, full=True)
+    proc.fds, proc.threads = 70, 30
+    result = sampler._sample_tree([proc], metrics, now=101.0, full=False)
+    assert (result['handles'], result['threads']) == (7, 3)
+    assert proc.thread_reads == 1
+
+
+# --- Export ---
+
+@pytest.fixture
+def filled(sampler):
+    for name, base in (("MongoDB", 1), ("Nginx", 10)):
+        metrics = sampler.metrics[name] = ServiceMetrics(5)
+        metrics.add(100.0, sample(cpu_percent=base, rss=base * 1000))
+        metrics.add(101.0, sample(cpu_percent=base + 1, rss=base * 2000, read_rate=2.5))
+    return sampler
+
+
+def test_export_csv(filled, tmp_path):
+    path = tmp_path / "metrics.csv"
+    filled.export_csv(str(path))
+    with open(path, newline='') as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == ['service', 'timestamp', 'cpu_percent', 'rss', 'handles', 'threads', 'read_rate', 'write_rate']
+    assert len(rows) == 5
+    assert rows[1] == ['MongoDB', '100.0', '1.0', '1000.0', '0.0', '0.0', '0.0', '0.0']
+    assert rows[4][:4] == ['Nginx', '101.0', '11.0', '20000.0']
+    assert rows[4][6] == '2.5'
+
+
+def test_export_json(filled, tmp_path):
+    path = tmp_path / "metrics.json"
+    filled.export_json(str(path))
+    data = json.loads(path.read_text())
+    assert list(data) == ["MongoDB", "Nginx"]
+    assert data["MongoDB"][1] == {"timestamp": 101.0, "cpu_percent": 2.0, "rss": 2000.0, "handles": 0.0,
+                                  "threads": 0.0, "read_rate": 2.5, "write_rate": 0.0}
@@ -0,0 +1,111 @@
+import threading
+
+import pytest
+
+from orchestrator import Orchestrator
+
+
+SERVICES = {
+    "db": {},
+    "cache": {},
+    "app": {"depends_on": ["db", "cache"]},
+    "web": {"depends_on": ["app"]},
+    "other": {},
+}
+
+
+class Recorder:
+    """start/stop callbacks that log the order of calls."""
+
+    def __init__(self, fail=()):
+        self.calls = []
+        self.fail = set(fail)
+        self.lock = threading.Lock()
+
+    def action(self, kind):
+        def run(name):
+            with self.lock:
+                self.calls.append((kind, name))
+            return name not in self.fail
+        return run
+
+    def order(self, kind):
+        return [name for k, name in self.calls if k == kind]
+
+
+def make(fail=()):
+    recorder = Recorder(fail)
+    return Orchestrator(SERVICES, recorder.action("start"), recorder.action("stop")), recorder
+
+
+def before(order, first, second):
+    return order.index(first) < order.index(second)
+
+
+def test_start_runs_dependencies_first():
+    orchestrator, recorder = make()
+    results = orchestrator.start(["web"])
+    assert results == {"db": True, "cache": True, "app": True, "web": True}
+    order = recorder.order("start")
+    assert before(order, "db", "app") and before(order, "cache", "app") and before(order, "app", "web")
+    assert "other" not in order
+
+
+def test_stop_runs_dependents_first():
+    orchestrator, recorder = make()
+    orchestrator.stop(["db", "cache", "app", "web"])
+    order = recorder.order("stop")
+    assert before(order, "web", "app") and before(order, "app", "db") and before(order, "app", "cache")
+
+
+def test_failed_dependency_skips_dependents():
+    orchestrator, recorder = make(fail={"db"})
+    skipped = []
+    results = orchestrator.start(["web"], on_skipped=lambda name, dep: skipped.append((name, dep)))
+    assert results == {"db": False, "cache": True, "app": False, "web": False}
+    assert sorted(skipped) == [("app", "db"), ("web", "app")]
+    assert "app" not in recorder.order("start")
+
+
+def test_with_dependencies_and_dependents():
+    orchestrator, _ = make()
+    assert orchestrator.with_dependencies(["web"]) == ["db", "cache", "app", "web"]
+    assert orchestrator.with_dependents(["db"]) == ["db", "app", "web"]
+    assert orchestrator.with_dependents(["other"]) == ["other"]
+
+
+def test_restart_includes_running_dependents():
+    orchestrator, recorder = make()
+    results = orchestrator.restart(["db"], active={"db", "cache", "app", "web"})
+    # "cache" is only (re)started as a dependency of "app"; it is never stopped
+    assert results == {"db": True, "cache": True, "app": True, "web": True}
+    stops, starts = recorder.order("stop"), recorder.order("start")
+    assert sorted(stops) == ["app", "db", "web"]
+    assert before(stops, "web", "app") and before(stops, "app", "db")
+    assert before(starts, "db", "app") and before(starts, "app", "web")
+    # Every stop finishes before anything starts again
+    assert recorder.calls.index(("start", "db")) > recorder.calls.index(("stop", "db"))
+
+
+def test_restart_leaves_stopped_dependents_alone():
+    orchestrator, recorder = make()
+    assert orchestrator.restart(["db"], active={"db"}) == {"db": True}
+    assert recorder.order("stop") == ["db"]
+    assert recorder.order("start") == ["db"]
+
+
+def test_restart_does_not_start_after_failed_stop():
+    recorder = Recorder()
+    orchestrator = Orchestrator(SERVICES, recorder.action("start"), lambda name: name != "app")
+    assert orchestrator.restart(["db"], active={"db", "app"}) == {"db": False, "app": False}
+    assert recorder.order("start") == []
+
+
+@pytest.mark.parametrize("services, message", [
+    ({"a": {"depends_on": ["missing"]}}, "unknown service"),
+    ({"a": {"depends_on": ["b"]}, "b": {"depends_on": ["a"]}}, "cycle"),
+    ({"a": {"depends_on": ["a"]}}, "cycle"),
+])
+def test_validate_rejects_bad_graphs(services, message):
+    with pytest.raises(ValueError, match=message):
+        Orchestrator(services, lambda name: True, lambda name: True)
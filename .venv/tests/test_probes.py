@@ -0,0 +1,258 @@
+import struct
+import threading
+import socketserver
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import pytest
+
+import probes
+from probes import (HTTPProbe, MongoPingProbe, Probe, TCPProbe, _bson_encode, _bson_get,
+                    _recv_exact, wait_until_ready)
+
+
+def bson(*elements):
+    body = b''.join(elements)
+    return struct.pack('<i', len(body) + 5) + body + b'\x00'
+
+
+def element(type_code, name, payload):
+    return bytes([type_code]) + name.encode() + b'\x00' + payload
+
+
+def serve(server):
+    thread = threading.Thread(target=server.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True)
+    thread.start()
+    return server
+
+
+@pytest.fixture
+def mongo_stub():
+    """OP_MSG server whose reply is chosen by the test through ``stub.reply``."""
+
+    class Handler(socketserver.BaseRequestHandler):
+        def handle(self):
+            try:
+                header = _recv_exact(self.request, 16)
+                length, request_id, _, op_code = struct.unpack('<iiii', header)
+                self.server.requests.append(_recv_exact(self.request, length - 16))
+                body = struct.pack('<IB', 0, 0) + self.server.reply
+                response_to = self.server.response_to if self.server.response_to is not None else request_id
+                self.request.sendall(struct.pack('<iiii', 16 + len(body), 0, response_to, op_code) + body)
+            except OSError:
+                pass
+
+    server = socketserver.ThreadingTCPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    server.requests = []
+    server.reply = _bson_encode({'ok': 1})
+    server.response_to = None
+    serve(server)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def mongo_probe(server):
+    return MongoPingProbe('127.0.0.1', server.server_address[1], timeout=1.0)
+
+
+# --- MongoPingProbe ---
+
+def test_mongo_ping_ok(mongo_stub):
+    assert mongo_probe(mongo_stub).check()
+    # The request is flagBits, a kind-0 section and {ping: 1, $db: "admin"}
+    request = mongo_stub.requests[0]
+    assert request[:5] == b'\x00\x00\x00\x00\x00'
+    assert _bson_get(request[5:], 'ping') == 1
+
+
+def test_mongo_ping_ok_as_double(mongo_stub):
+    # Real mongod answers {ok: 1.0}
+    mongo_stub.reply = bson(element(0x01, 'ok', struct.pack('<d', 1.0)))
+    assert mongo_probe(mongo_stub).check()
+
+
+def test_mongo_ping_not_ok(mongo_stub):
+    mongo_stub.reply = bson(element(0x01, 'ok', struct.pack('<d', 0.0)),
+                            element(0x02, 'errmsg', struct.pack('<i', 4) + b'no!\x00'))
+    assert not mongo_probe(mongo_stub).check()
+
+
+def test_mongo_ping_wrong_response_to(mongo_stub):
+    mongo_stub.response_to = 12345
+    assert not mongo_probe(mongo_stub).check()
+
+
+def test_mongo_ping_nothing_listening():
+    with socketserver.TCPServer(('127.0.0.1', 0), socketserver.BaseRequestHandler) as server:
+        port = server.server_address[1]
+    assert not MongoPingProbe('127.0.0.1', port, timeout=0.2).check()
+
+
+# --- _bson_get ---
+
+def test_bson_get_numeric_types():
+    doc = bson(
+        element(0x10, 'i32', struct.pack('<i', -7)),
+        element(0x12, 'i64', struct.pack('<q', 1 << 40)),
+        element(0x01, 'dbl', struct.pack('<d', 2.5)),
+        element(0x08, 'yes', b'\x01'),
+    )
+    assert _bson_get(doc, 'i32') == -7
+    assert _bson_get(doc, 'i64') == 1 << 40
+    assert _bson_get(doc, 'dbl') == 2.5
+    assert _bson_get(doc, 'yes') is True
+    assert _bson_get(doc, 'missing') is None
+
+
+def test_bson_get_skips_variable_width_elements():
+    nested = bson(element(0x10, 'ok', struct.pack('<i', 0)))
+    doc = bson(
+        element(0x02, 'msg', struct.pack('<i', 6) + b'hello\x00'),
+        element(0x03, 'sub', nested),
+        element(0x05, 'bin', struct.pack('<i', 3) + b'\x00abc'),
+        element(0x07, 'oid', b'\x00' * 12),
+        element(0x0B, 're', b'a.*\x00i\x00'),
+        element(0x0A, 'null', b''),
+        element(0x10, 'ok', struct.pack('<i', 1)),
+    )
+    # The nested "ok": 0 must not be mistaken for the top-level one
+    assert _bson_get(doc, 'ok') == 1
+
+
+def test_bson_get_ignores_non_numeric_and_short_input():
+    doc = bson(element(0x02, 'ok', struct.pack('<i', 2) + b'1\x00'))
+    assert _bson_get(doc, 'ok') is None
+    assert _bson_get(b'\x05\x00', 'ok') is None
+
+
+def test_bson_encode_round_trip():
+    doc = _bson_encode({'ping': 1, '$db': 'admin'})
+    assert struct.unpack_from('<i', doc)[0] == len(doc)
+    assert _bson_get(doc, 'ping') == 1
+
+
+# --- HTTPProbe / TCPProbe ---
+
+@pytest.fixture
+def http_stub():
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            status = int(self.path.strip('/') or 200)
+            self.send_response(status)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+
+        def log_message(self, format, *args):
+            pass
+
+    server = serve(ThreadingHTTPServer(('127.0.0.1', 0), Handler))
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.parametrize("status, ready", [(200, True), (404, True), (302, True), (500, False), (503, False)])
+def test_http_probe_status(http_stub, status, ready):
+    assert HTTPProbe(f"{http_stub}/{status}").check() is ready
+
+
+def test_http_and_tcp_probe_nothing_listening():
+    with socketserver.TCPServer(('127.0.0.1', 0), socketserver.BaseRequestHandler) as server:
+        port = server.server_address[1]
+    assert not HTTPProbe(f"http://127.0.0.1:{port}/", timeout=0.2).check()
+    assert not TCPProbe('127.0.0.1', port, timeout=0.2).check()
+
+
+def test_tcp_probe_listening(http_stub):
+    port = int(http_stub.rsplit(':', 1)[1])
+    assert TCPProbe('127.0.0.1', port).check()
+
+
+# --- wait_until_ready ---
+
+class CountingProbe(Probe):
+    def __init__(self, passes_on=None):
+        self.passes_on = passes_on
+        self.checks = 0
+
+    def check(self):
+        self.checks += 1
+        return self.passes_on is not None and self.checks >= self.passes_on
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(probes, 'time', clock)
+    return clock
+
+
+def test_wait_until_ready_immediately(clock):
+    probe = CountingProbe(passes_on=1)
+    assert wait_until_ready([probe], timeout=5) == (True, [])
+    assert clock.sleeps == []
+
+
+def test_wait_until_ready_backoff_doubles_up_to_max(clock):
+    probe = CountingProbe(passes_on=9)
+    ready, pending = wait_until_ready([probe], timeout=30, initial_delay=0.005, max_delay=0.25)
+    assert ready and pending == []
+    assert clock.sleeps == pytest.approx([0.005, 0.01, 0.02, 0.04, 0.08, 0.16, 0.25, 0.25])
+
+
+def test_wait_until_ready_passed_probes_are_not_rechecked(clock):
+    fast, slow = CountingProbe(passes_on=1), CountingProbe(passes_on=4)
+    assert wait_until_ready([fast, slow], timeout=5)[0]
+    assert fast.checks == 1
+    assert slow.checks == 4
+
+
+def test_wait_until_ready_deadline(clock):
+    probe = CountingProbe()
+    ready, pending = wait_until_ready([probe], timeout=1.0, max_delay=0.25)
+    assert not ready and pending == [probe]
+    # Never sleeps past the deadline
+    assert clock.now == pytest.approx(1.0)
+
+
+def test_wait_until_ready_stops_when_process_dies(clock):
+    probe = CountingProbe()
+    calls = []
+
+    def alive():
+        calls.append(1)
+        return len(calls) < 3
+
+    ready, pending = wait_until_ready([probe], timeout=30, alive=alive)
+    assert not ready and pending == [probe]
+    assert probe.checks == 3
+    assert clock.now < 1.0
+
+
+def test_wait_until_ready_not_ready_if_dead_when_probes_pass(clock):
+    # e.g. our nginx failed to bind port 80 and exited, but another server answers there
+    probe = CountingProbe(passes_on=1)
+    ready, pending = wait_until_ready([probe], timeout=30, alive=lambda: False)
+    assert not ready and pending == []
+    assert probe.checks == 1
+
+
+def test_wait_until_ready_reports_attempts(clock):
+    attempts = []
+    wait_until_ready([CountingProbe(passes_on=3)], timeout=5,
+                     on_attempt=lambda attempt, pending: attempts.append((attempt, len(pending))))
+    assert attempts == [(1, 1), (2, 1), (3, 0)]
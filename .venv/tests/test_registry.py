@@ -0,0 +1,134 @@
+import json
+
+import pytest
+
+from registry import RegistryError, ServiceRegistry, load_services
+
+
+def service(**overrides):
+    config = {"start": ["svc"], "log_path": "svc.log", "service_path": "."}
+    config.update(overrides)
+    return config
+
+
+@pytest.fixture
+def write(tmp_path):
+    def write(services):
+        path = tmp_path / "services.json"
+        path.write_text(json.dumps({"services": services}), encoding="utf-8")
+        return str(path)
+    return write
+
+
+def test_defaults_are_filled_in(write):
+    config = load_services(write({"A": service()}), "linux")["A"]
+    assert config["stop"] is None
+    assert config["probes"] == []
+    assert config["ready_timeout"] == 30
+    assert config["icon"]
+
+
+def test_platform_values(write):
+    path = write({"A": service(
+        start={"windows": ["a.exe"], "default": ["a"]},
+        log_path={"linux": "/var/log/a.log", "default": "a.log"},
+    )})
+    linux = load_services(path, "linux")["A"]
+    windows = load_services(path, "windows")["A"]
+    assert (linux["start"], linux["log_path"]) == (["a"], "/var/log/a.log")
+    assert (windows["start"], windows["log_path"]) == (["a.exe"], "a.log")
+
+
+def test_instances_expand_and_keep_types(write):
+    path = write({"Redis": service(
+        start=["redis-server", "--port={port}"],
+        log_path="redis-{port}.log",
+        probes=[{"type": "tcp", "port": "{port}"}],
+        instances=[{"name": "main", "port": 6379}, {"name": "cache", "port": 6380}],
+    )})
+    services = load_services(path, "linux")
+    assert list(services) == ["Redis main", "Redis cache"]
+    cache = services["Redis cache"]
+    assert cache["start"] == ["redis-server", "--port=6380"]
+    assert cache["log_path"] == "redis-6380.log"
+    assert cache["probes"] == [{"type": "tcp", "port": 6380}]
+    assert "instances" not in cache
+
+
+def test_instances_fill_commands_with_text(write):
+    path = write({"Mongo": service(
+        start=["mongod", "--port", "{port}", "--dbpath", "{dbpath}"],
+        stop=["mongod", "--shutdown", "--port", "{port}"],
+        ready_timeout="{timeout}",
+        probes=[{"type": "mongo", "port": "{port}"}],
+        instances=[{"name": "rs0", "port": 27017, "dbpath": "data/rs0", "timeout": 45}],
+    )})
+    config = load_services(path, "linux")["Mongo rs0"]
+    assert config["start"] == ["mongod", "--port", "27017", "--dbpath", "data/rs0"]
+    assert config["stop"] == ["mongod", "--shutdown", "--port", "27017"]
+    assert config["probes"] == [{"type": "mongo", "port": 27017}]
+    assert config["ready_timeout"] == 45
+
+
+def test_instances_can_be_depended_on(write):
+    path = write({
+        "Redis": service(instances=[{"name": "main"}]),
+        "App": service(depends_on=["Redis main"]),
+    })
+    assert load_services(path, "linux")["App"]["depends_on"] == ["Redis main"]
+
+
+def test_unknown_placeholder(write):
+    path = write({"A": service(log_path="{missing}.log", instances=[{"name": "x"}])})
+    with pytest.raises(RegistryError, match="missing"):
+        load_services(path, "linux")
+
+
+@pytest.mark.parametrize("services, message", [
+    ({}, "non-empty"),
+    ({"A": []}, "must be an object"),
+    ({"A": service(colour="red")}, "unknown keys colour"),
+    ({"A": {"start": ["svc"], "service_path": "."}}, "missing \"log_path\""),
+    ({"A": service(start="svc")}, "\"start\" must be"),
+    ({"A": service(stop=[])}, "\"stop\" must be"),
+    ({"A": service(ready_timeout=0)}, "ready_timeout"),
+    ({"A": service(ready_timeout=True)}, "ready_timeout"),
+    ({"A": service(probes=[{"type": "smoke"}])}, "unknown probe"),
+    ({"A": service(probes=[{"type": "tcp"}])}, "need a \"port\""),
+    ({"A": service(probes=[{"type": "log"}])}, "need a \"pattern\""),
+    ({"A": service(depends_on="B")}, "list of strings"),
+    ({"A": service(depends_on=["B"])}, "unknown service 'B'"),
+    ({"A": service(instances=[])}, "non-empty list"),
+    ({"A": service(instances=[{"port": 1}])}, "needs a \"name\""),
+])
+def test_invalid_definitions(write, services, message):
+    with pytest.raises(RegistryError, match=message):
+        load_services(write(services), "linux")
+
+
+def test_dependency_cycle(write):
+    path = write({
+        "A": service(depends_on=["B"]),
+        "B": service(depends_on=["C"]),
+        "C": service(depends_on=["B"]),
+    })
+    with pytest.raises(RegistryError, match="Dependency cycle: B -> C -> B"):
+        load_services(path, "linux")
+
+
+def test_missing_and_malformed_files(tmp_path):
+    with pytest.raises(RegistryError, match="not found"):
+        load_services(str(tmp_path / "nope.json"), "linux")
+    bad = tmp_path / "bad.json"
+    bad.write_text("{", encoding="utf-8")
+    with pytest.raises(RegistryError, match="Invalid JSON"):
+        load_services(str(bad), "linux")
+
+
+def test_registry_loads_lazily(write, tmp_path):
+    path = write({"A": service()})
+    registry = ServiceRegistry(path, "Linux")
+    assert registry._services is None
+    assert list(registry.validate()) == ["A"]
+    (tmp_path / "services.json").write_text("{", encoding="utf-8")
+    assert list(registry.services) == ["A"]
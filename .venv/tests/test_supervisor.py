@@ -0,0 +1,186 @@
+import os
+import sys
+import time
+import shutil
+import signal
+import subprocess
+
+import psutil
+import pytest
+
+from supervisor import ProcessSupervisor
+
+posix_only = pytest.mark.skipif(os.name != 'posix', reason="uses POSIX signals")
+
+# Starts a child that sleeps (ignoring SIGTERM when asked), prints its PID and
+# then sleeps itself, optionally ignoring SIGTERM as well. Neither reaps.
+TREE = """
+import sys, time, signal, subprocess
+ignore_child, ignore_parent = sys.argv[1] == '1', sys.argv[2] == '1'
+code = 'import time, signal\\n'
+if ignore_child:
+    code += 'signal.signal(signal.SIGTERM, signal.SIG_IGN)\\n'
+code += 'print(1, flush=True)\\ntime.sleep(60)'
+child = subprocess.Popen([sys.executable, '-c', code], stdout=subprocess.PIPE)
+child.stdout.readline()
+if ignore_parent:
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+print(child.pid, flush=True)
+time.sleep(60)
+"""
+
+
+@pytest.fixture
+def supervisor():
+    exited = []
+    supervisor = ProcessSupervisor(on_exit=exited.append)
+    supervisor.exited = exited
+    yield supervisor
+    for record in list(supervisor.records.values()):
+        for proc in record.tree():
+            try:
+                proc.kill()
+            except psutil.NoSuchProcess:
+                pass
+
+
+@pytest.fixture
+def cleanup():
+    procs = []
+    yield procs
+    for proc in procs:
+        try:
+            proc.kill()
+            proc.wait()
+        except (OSError, psutil.NoSuchProcess):
+            pass
+
+
+def spawn_tree(supervisor, ignore_child=False, ignore_parent=False):
+    command = [sys.executable, '-c', TREE, str(int(ignore_child)), str(int(ignore_parent))]
+    record = supervisor.spawn("svc", command)
+    # Wait until the child is up (and the parent ignores SIGTERM, if asked)
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        children = record.refresh_children()
+        if children and (not ignore_parent or _ignores_sigterm(record.process)):
+            return record, children[0]
+        time.sleep(0.02)
+    raise AssertionError("child process did not start")
+
+
+def _ignores_sigterm(proc):
+    try:
+        with open(f"/proc/{proc.pid}/status") as f:
+            for line in f:
+                if line.startswith("SigIgn:"):
+                    return int(line.split()[1], 16) & (1 << (signal.SIGTERM - 1))
+    except OSError:
+        pass
+    # Without /proc, give the script time to install its handler
+    time.sleep(0.5)
+    return True
+
+
+def gone(proc):
+    try:
+        return not proc.is_running() or proc.status() == psutil.STATUS_ZOMBIE
+    except psutil.NoSuchProcess:
+        return True
+
+
+def test_spawn_tracks_process(supervisor):
+    record, child = spawn_tree(supervisor)
+    assert supervisor.get("svc") is record
+    assert supervisor.is_alive("svc")
+    assert record.pid == record.popen.pid
+    assert [proc.pid for proc in record.children] == [child.pid]
+
+
+def test_exit_is_noticed(supervisor):
+    record = supervisor.spawn("svc", [sys.executable, '-c', 'import sys; sys.exit(3)'])
+    assert supervisor.wait_exit("svc", timeout=10)
+    assert record.returncode == 3
+    assert not record.is_alive()
+    assert supervisor.exited == [record]
+    assert supervisor.get("svc") is None
+
+
+def test_wait_exit_times_out(supervisor):
+    record, _ = spawn_tree(supervisor)
+    assert not supervisor.wait_exit("svc", timeout=0.1)
+    assert supervisor.get("svc") is record
+
+
+def test_unknown_service(supervisor):
+    assert not supervisor.is_alive("svc")
+    assert supervisor.wait_exit("svc", timeout=0)
+    assert supervisor.terminate("svc", timeout=0)
+
+
+@posix_only
+def test_terminate_stops_the_tree(supervisor):
+    record, child = spawn_tree(supervisor)
+    start = time.monotonic()
+    assert supervisor.terminate("svc", timeout=5)
+    assert time.monotonic() - start < 3
+    assert record.returncode == -signal.SIGTERM
+    assert gone(child)
+    assert supervisor.get("svc") is None
+
+
+@posix_only
+def test_terminate_kills_child_ignoring_sigterm(supervisor):
+    record, child = spawn_tree(supervisor, ignore_child=True)
+    start = time.monotonic()
+    assert supervisor.terminate("svc", timeout=5)
+    # The parent exits on SIGTERM, so the child is killed straight away
+    assert time.monotonic() - start < 3
+    assert gone(child)
+
+
+@posix_only
+def test_terminate_kills_after_timeout(supervisor):
+    record, child = spawn_tree(supervisor, ignore_parent=True)
+    start = time.monotonic()
+    assert supervisor.terminate("svc", timeout=0.5)
+    assert 0.5 <= time.monotonic() - start < 3
+    assert record.returncode == -signal.SIGKILL
+    assert gone(child)
+
+
+@posix_only
+def test_adopted_zombie_counts_as_exited(supervisor, cleanup):
+    # Adopt a grandchild whose parent never reaps it, so it stays a zombie
+    parent = subprocess.Popen([sys.executable, '-c', TREE, '0', '0'], stdout=subprocess.PIPE, text=True)
+    cleanup.append(parent)
+    pid = int(parent.stdout.readline())
+    record = supervisor.adopt("svc", psutil.Process(pid))
+    assert record.is_alive()
+
+    start = time.monotonic()
+    assert supervisor.terminate("svc", timeout=5)
+    assert time.monotonic() - start < 1
+    assert record.exited.is_set()
+    assert supervisor.exited == [record]
+
+
+@pytest.mark.skipif(shutil.which("sleep") is None, reason="needs sleep on PATH")
+def test_adopt_running_matches_command_line(supervisor, cleanup):
+    ours = subprocess.Popen(["sleep", "300"])
+    other = subprocess.Popen(["sleep", "301"])
+    cleanup.extend([ours, other])
+    services = {
+        "Ours": {"start": ["sleep", "300"]},
+        "Missing": {"start": ["sleep", "302"], "process": "sleep"},
+    }
+    deadline = time.monotonic() + 5
+    adopted = []
+    while not adopted and time.monotonic() < deadline:
+        adopted = supervisor.adopt_running(services)
+        time.sleep(0.02)
+    assert adopted == ["Ours"]
+    assert supervisor.get("Ours").pid == ours.pid
+    assert supervisor.get("Missing") is None
+    # Already supervised services are not looked up again
+    assert supervisor.adopt_running(services) == []